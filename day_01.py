@@ -51,7 +51,10 @@ Here are other examples:
 What is the first frequency your device reaches twice?
 """
 
+from collections import defaultdict
 import itertools
+from typing import Iterable, List, Optional
+
 
 def run_part_1( steps: list ):
 	"""
@@ -64,7 +67,56 @@ def run_part_1( steps: list ):
 	print( 'FINAL FREQUENCY: ', sum( steps ) )
 
 
-def run_part_2( steps: list, starting_frequency: int ):
+def _find_first_repeat_offset( steps: list ) -> Optional[ int ]:
+	"""
+	Works out the first repeated frequency, relative to the starting frequency, without cycling over the steps.
+
+	Every frequency the device reaches is start + k * drift + p[ i ], where p[ i ] is the sum of the first i steps
+	( 0 <= i < len( steps ) ), k is the number of completed passes and drift is sum( steps ). Prefix sums that share a
+	residue modulo the drift will eventually land on each other: p[ i ] reaches p[ j ] after ( p[ j ] - p[ i ] ) / drift
+	passes. Sorting each residue group and pairing every prefix sum with its neighbour in the direction of the drift
+	gives every candidate repeat, and the one that happens first in time wins.
+
+	Arguments:
+		steps {list} -- Frequency tuning steps.
+
+	Returns:
+		int -- The first repeated frequency minus the starting frequency, or None if no frequency is ever repeated.
+	"""
+
+	if not steps:
+		return None
+
+	prefix_sums = list( itertools.accumulate( steps[ : -1 ], initial = 0 ) )
+	drift = sum( steps )
+
+	# A repeat inside the first pass always happens before any repeat that needs a further pass.
+	seen = set( )
+	for p in prefix_sums:
+		if p in seen:
+			return p
+		seen.add( p )
+
+	if drift == 0:
+		return 0
+
+	residue_groups = defaultdict( list )
+	for i, p in enumerate( prefix_sums ):
+		residue_groups[ p % abs( drift ) ].append( ( p, i ) )
+
+	first_repeat = None
+	for group in residue_groups.values( ):
+		group.sort( reverse = drift < 0 )
+		for ( p, i ), ( target, _j ) in zip( group, group[ 1 : ] ):
+			passes = ( target - p ) // drift
+			time = passes * len( steps ) + i
+			if first_repeat is None or time < first_repeat[ 0 ]:
+				first_repeat = ( time, target )
+
+	return first_repeat[ 1 ] if first_repeat else None
+
+
+def run_part_2( steps: list, starting_frequency: int, cycle_analysis: bool = False ):
 	"""
 	Finds the first repeated frequency encountered when stepping through
 	the list of provided frequency changes. The list may be cycled over more than
@@ -73,8 +125,20 @@ def run_part_2( steps: list, starting_frequency: int ):
 	Arguments:
 		steps {list} -- Frequency tuning steps.
 		starting_frequency {int} -- The starting fequency
+
+	Keyword Arguments:
+		cycle_analysis {bool} -- Solve from the prefix sums of a single pass instead of cycling over the steps.
+			Step lists that never repeat are reported rather than looping forever. (default: {False})
 	"""
 
+	if cycle_analysis:
+		offset = _find_first_repeat_offset( steps )
+		if offset is None:
+			print( 'NO DUPLICATE FREQUENCY' )
+		else:
+			print( 'DUPLICATE FREQUENCY: ', starting_frequency + offset )
+		return
+
 	tuned_frequencies = set( [ starting_frequency ] )
 	current_frequency = starting_frequency
 
@@ -87,7 +151,28 @@ def run_part_2( steps: list, starting_frequency: int ):
 		tuned_frequencies.add( current_frequency )
 
 
+def run_part_2_batch( steps: list, starting_frequencies: Iterable[ int ] ) -> List[ Optional[ int ] ]:
+	"""
+	Finds the first repeated frequency for many devices that share one list of frequency changes but start from
+	different frequencies. The prefix-sum analysis of the steps is done once; since every visited frequency is just
+	the starting frequency plus a value that depends only on the steps, each device's answer is a single addition.
+
+	Arguments:
+		steps {list} -- Frequency tuning steps shared by every device.
+		starting_frequencies {Iterable[ int ]} -- The starting frequency of each device.
+
+	Returns:
+		list -- The first repeated frequency for each starting frequency, in order, or None where no frequency is ever repeated.
+	"""
+
+	offset = _find_first_repeat_offset( steps )
+	if offset is None:
+		return [ None for _s in starting_frequencies ]
+
+	return [ s + offset for s in starting_frequencies ]
+
+
 if __name__ == '__main__':
 	steps = [ int( x ) for x in open( 'day_01_input.txt' ).readlines( ) ]
 	run_part_1( steps )
-	run_part_2( steps, 0 )
+	run_part_2( steps, 0, cycle_analysis = True )
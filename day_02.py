@@ -41,9 +41,11 @@ The IDs abcde and axcye are close, but they differ by two characters (the second
 What letters are common between the two correct box IDs? (In the example above, this is found by removing the differing character from either ID, producing fgij.)
 """
 
-from collections import Counter
-from difflib import SequenceMatcher
-from typing import Sequence
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, combinations, repeat
+import numpy
+from typing import Dict, List, Optional, Sequence, Tuple
 
 
 def calculate_checksum( input_lines: Sequence[ str ] ) -> int:
@@ -70,32 +72,432 @@ def calculate_checksum( input_lines: Sequence[ str ] ) -> int:
 	return twos * threes
 
 
-def get_matching_box_ids( input_lines: Sequence[ str ] ) -> str:
+def _load_box_ids_array( filepath: str ) -> numpy.ndarray:
+	"""
+	Loads a file of fixed-length box ids straight into a 2-D uint8 array, one row per id, without creating a string
+	per line.
+
+	Arguments:
+		filepath {str} -- Path to a file with one box id per line. Every id must be the same length.
+
+	Raises:
+		ValueError -- The box ids are not all the same length.
+
+	Returns:
+		numpy.ndarray -- ( id count, id length ) array of the raw id bytes, without line endings.
+	"""
+
+	raw = numpy.fromfile( filepath, dtype = numpy.uint8 )
+	if not raw.size:
+		return raw.reshape( 0, 0 )
+
+	if raw[ -1 ] != ord( '\n' ):
+		raw = numpy.append( raw, numpy.uint8( ord( '\n' ) ) )
+
+	newlines = numpy.flatnonzero( raw == ord( '\n' ) )
+	row_length = int( newlines[ 0 ] ) + 1
+	uneven_lines = numpy.flatnonzero( numpy.diff( newlines, prepend = -1 ) != row_length )
+	if uneven_lines.size:
+		raise ValueError( '{0}: line {1} is not the same length as the first box id ( {2} characters ).'.format(
+			filepath, int( uneven_lines[ 0 ] ) + 1, row_length - 1 ) )
+
+	box_ids = raw.reshape( -1, row_length )[ :, : -1 ]
+	if box_ids.shape[ 1 ] and ( box_ids[ :, -1 ] == ord( '\r' ) ).all( ):
+		box_ids = box_ids[ :, : -1 ]
+
+	return box_ids
+
+
+def calculate_checksum_batch( box_ids: numpy.ndarray, block_size: int = 8192 ) -> Tuple[ int, numpy.ndarray ]:
+	"""
+	Vectorized version of calculate_checksum( ) for very large numbers of fixed-length box ids.
+	Letter counts for a block of rows are taken with a single bincount over ( row * 256 + byte ), and a second bincount
+	over those counts gives which multiplicities appear in each row.
+
+	Arguments:
+		box_ids {numpy.ndarray} -- ( id count, id length ) uint8 array, as returned by _load_box_ids_array( ).
+
+	Keyword Arguments:
+		block_size {int} -- The number of rows counted at once. Bounds the size of the intermediate count arrays. (default: {8192})
+
+	Returns:
+		int -- The calculated checksum from the box ids.
+		numpy.ndarray -- For each multiplicity m, the number of box ids containing some letter exactly m times.
+	"""
+
+	id_count, id_length = box_ids.shape
+	multiplicities = numpy.zeros( id_length + 1, dtype = numpy.int64 )
+
+	for start in range( 0, id_count, block_size ):
+		block = box_ids[ start : start + block_size ].astype( numpy.int64 )
+		rows = numpy.arange( len( block ), dtype = numpy.int64 )[ :, None ]
+
+		letter_counts = numpy.bincount( ( rows * 256 + block ).ravel( ), minlength = len( block ) * 256 ).reshape( len( block ), 256 )
+		present = numpy.bincount( ( rows * ( id_length + 1 ) + letter_counts ).ravel( ),
+										  minlength = len( block ) * ( id_length + 1 ) ).reshape( len( block ), id_length + 1 )
+		multiplicities += ( present > 0 ).sum( axis = 0 )
+
+	multiplicities[ 0 ] = 0 # Every row has letters that don't appear in it.
+	twos = int( multiplicities[ 2 ] ) if id_length >= 2 else 0
+	threes = int( multiplicities[ 3 ] ) if id_length >= 3 else 0
+
+	return twos * threes, multiplicities
+
+
+_HASH_BASE = 1000003
+
+
+def _find_box_ids_differing_by_one( input_lines: Sequence[ str ] ) -> Optional[ Tuple[ str, str ] ]:
 	"""
-	Finds the two box IDs with the highest ratio of identical characters and returns the characters common to both of those box ids.
+	Finds two box IDs that differ by exactly one character in the same position.
+	IDs of the same length are loaded into one array of character codes and given a polynomial hash ( wrapping at
+	2 ** 64 ). For every position, the hash of each ID with that position masked out is one vectorized subtraction, and
+	sorting those masked hashes brings IDs that differ only at that position next to each other. Each pass keeps just
+	one array of n hashes alive, so time is O( n x L ) plus the sorts. Hash hits are checked against the strings, so
+	collisions can't produce a wrong pair.
 
 	Arguments:
 		input_lines {list} -- list of box ids
 
 	Returns:
-		str -- characters common to the two box ids with the highest comparison ratio.
+		tuple -- two box ids that differ by one character, or None if no such pair exists.
+	"""
+
+	ids_by_length = defaultdict( list )
+	for il in input_lines:
+		box_id = il.rstrip( )
+		ids_by_length[ len( box_id ) ].append( box_id )
+
+	for length, box_ids in ids_by_length.items( ):
+		if length == 0 or len( box_ids ) < 2:
+			continue
+
+		codes = numpy.frombuffer( ''.join( box_ids ).encode( 'utf-32-le' ), dtype = numpy.uint32 ).reshape( -1, length ).astype( numpy.uint64 )
+		powers = numpy.array( [ pow( _HASH_BASE, length - 1 - j, 1 << 64 ) for j in range( length ) ], dtype = numpy.uint64 )
+		hashes = ( codes * powers ).sum( axis = 1, dtype = numpy.uint64 )
+
+		for i in range( length ):
+			masked = hashes - codes[ :, i ] * powers[ i ]
+			order = numpy.argsort( masked, kind = 'stable' )
+			sorted_masked = masked[ order ]
+
+			# Only runs of equal masked hashes whose characters at position i are not all the same can hold a pair.
+			same_key = sorted_masked[ 1 : ] == sorted_masked[ : -1 ]
+			different_char = codes[ order[ 1 : ], i ] != codes[ order[ : -1 ], i ]
+			for run_start in numpy.flatnonzero( same_key & different_char ):
+				key = sorted_masked[ run_start ]
+				first = numpy.searchsorted( sorted_masked, key, side = 'left' )
+				last = numpy.searchsorted( sorted_masked, key, side = 'right' )
+				candidates = dict.fromkeys( box_ids[ c ] for c in sorted( order[ first : last ].tolist( ) ) )
+				for x, y in combinations( candidates, 2 ):
+					if x[ i ] != y[ i ] and x[ : i ] == y[ : i ] and x[ i + 1 : ] == y[ i + 1 : ]:
+						return x, y
+
+	return None
+
+
+def _common_characters( a: str, b: str ) -> str:
+	"""
+	Returns the characters that two box ids share in the same positions, in their original order.
+
+	Arguments:
+		a {str} -- first box id
+		b {str} -- second box id
+
+	Returns:
+		str -- the characters common to both box ids.
+	"""
+
+	return ''.join( x for x, y in zip( a, b ) if x == y )
+
+
+def _bounded_edit_distance( a: str, b: str, max_distance: int ) -> int:
+	"""
+	Calculates the Levenshtein distance between two box ids, giving up as soon as it must be more than max_distance.
+	Only the band of the table within max_distance of the diagonal is filled in, so the cost is O( L x max_distance ).
+
+	Arguments:
+		a {str} -- first box id
+		b {str} -- second box id
+		max_distance {int} -- The largest distance of interest.
+
+	Returns:
+		int -- the edit distance, or max_distance + 1 if it is larger than max_distance.
+	"""
+
+	if abs( len( a ) - len( b ) ) > max_distance:
+		return max_distance + 1
+
+	too_far = max_distance + 1
+	previous_row = { j: j for j in range( min( len( b ), max_distance ) + 1 ) }
+	for i in range( 1, len( a ) + 1 ):
+		current_row = { }
+		for j in range( max( 0, i - max_distance ), min( len( b ), i + max_distance ) + 1 ):
+			if j == 0:
+				current_row[ j ] = i
+				continue
+			substitution = previous_row.get( j - 1, too_far ) + ( a[ i - 1 ] != b[ j - 1 ] )
+			current_row[ j ] = min( substitution, previous_row.get( j, too_far ) + 1, current_row.get( j - 1, too_far ) + 1, too_far )
+
+		if min( current_row.values( ) ) > max_distance:
+			return too_far
+		previous_row = current_row
+
+	return previous_row.get( len( b ), too_far )
+
+
+def _segments( length: int, parts: int ) -> List[ Tuple[ int, int ] ]:
+	"""
+	Splits a box id length into parts contiguous segments whose lengths differ by at most one.
+
+	Arguments:
+		length {int} -- The length of the box id.
+		parts {int} -- The number of segments.
+
+	Returns:
+		list -- ( start, segment length ) for each segment.
+	"""
+
+	short_length, long_count = divmod( length, parts )
+	segments = [ ]
+	start = 0
+	for j in range( parts ):
+		segment_length = short_length + ( j >= parts - long_count )
+		segments.append( ( start, segment_length ) )
+		start += segment_length
+
+	return segments
+
+
+def _build_partition_index( box_ids: Sequence[ str ], max_distance: int ) -> Dict[ Tuple[ int, int, str ], List[ int ] ]:
+	"""
+	Builds a partition filter index for finding box ids within max_distance edits. Every id is cut into
+	max_distance + 1 segments. At most max_distance edits can touch at most max_distance segments, so any id within
+	that distance of another must still contain one of its segments unchanged, shifted by at most max_distance
+	positions. The index is good for any radius up to max_distance.
+
+	Arguments:
+		box_ids {list} -- list of box ids
+		max_distance {int} -- The largest edit distance the index will be queried with.
+
+	Returns:
+		dict -- ( id length, segment number, segment ) to the indices of the ids containing it.
 	"""
 
-	highest_ratio = 0.00
-	highest_lines = ( 0, 0 )
+	index = defaultdict( list )
+	for idx, box_id in enumerate( box_ids ):
+		for j, ( start, segment_length ) in enumerate( _segments( len( box_id ), max_distance + 1 ) ):
+			index[ ( len( box_id ), j, box_id[ start : start + segment_length ] ) ].append( idx )
+
+	return index
+
+
+def _find_pairs_in_range( box_ids: Sequence[ str ], index: Dict[ Tuple[ int, int, str ], List[ int ] ], index_distance: int,
+								  query_range: Tuple[ int, int ], max_distance: int ) -> List[ Tuple[ int, int, int ] ]:
+	"""
+	Finds every pair within max_distance whose second id falls in the query range. Each query id looks up its own
+	substrings at every place a segment of an id of a nearby length could have moved to, and the candidates are checked
+	with _bounded_edit_distance( ). Pairs are only reported from the higher index so each pair is found once.
+
+	Arguments:
+		box_ids {list} -- list of box ids
+		index {dict} -- The index from _build_partition_index( ).
+		index_distance {int} -- The max_distance the index was built for.
+		query_range {tuple} -- ( start, stop ) indices of the box ids to query.
+		max_distance {int} -- The largest edit distance to include. Must not exceed index_distance.
+
+	Returns:
+		list -- ( distance, index_a, index_b ) tuples, index_a < index_b.
+	"""
+
+	pairs = [ ]
+	for i in range( *query_range ):
+		box_id = box_ids[ i ]
+		candidates = set( )
+		for length in range( max( 0, len( box_id ) - max_distance ), len( box_id ) + max_distance + 1 ):
+			for j, ( start, segment_length ) in enumerate( _segments( length, index_distance + 1 ) ):
+				for position in range( max( 0, start - max_distance ), min( len( box_id ) - segment_length, start + max_distance ) + 1 ):
+					candidates.update( index.get( ( length, j, box_id[ position : position + segment_length ] ), ( ) ) )
+
+		for c in candidates:
+			if c < i:
+				distance = _bounded_edit_distance( box_ids[ c ], box_id, max_distance )
+				if distance <= max_distance:
+					pairs.append( ( distance, c, i ) )
+
+	return pairs
+
+
+_worker_box_ids = None
+_worker_indexes = { }
+
+def _init_pair_worker( box_ids: Sequence[ str ] ):
+	"""
+	Process pool initializer that stores the box ids in the worker process, so they are only sent once per pool.
+
+	Arguments:
+		box_ids {list} -- list of box ids
+	"""
+
+	global _worker_box_ids
+	_worker_box_ids = box_ids
+	_worker_indexes.clear( )
+
+
+def _find_pairs_for_chunk( query_range: Tuple[ int, int ], max_distance: int ) -> List[ Tuple[ int, int, int ] ]:
+	"""
+	Process pool task for _find_pairs_in_range( ). Each worker builds the partition index for a radius the first time
+	it is asked for it and keeps it for later chunks.
+
+	Arguments:
+		query_range {tuple} -- ( start, stop ) indices of the box ids to query.
+		max_distance {int} -- The largest edit distance to include.
+
+	Returns:
+		list -- ( distance, index_a, index_b ) tuples.
+	"""
+
+	if max_distance not in _worker_indexes:
+		_worker_indexes[ max_distance ] = _build_partition_index( _worker_box_ids, max_distance )
+
+	return _find_pairs_in_range( _worker_box_ids, _worker_indexes[ max_distance ], max_distance, query_range, max_distance )
+
+
+class _PairSearch( ):
+	"""
+	Searches one list of box ids for close pairs at one or more radii. The ids are stripped and, when more than one
+	worker is asked for, shipped to a single process pool once; the pool is reused for every radius until the search
+	is closed.
+	"""
+
+	def __init__( self, input_lines: Sequence[ str ], workers: int = 1 ):
+		self._box_ids = [ il.rstrip( ) for il in input_lines ]
+		self._workers = workers
+		self._indexes = { }
+		self._executor = None
+		if workers > 1:
+			self._executor = ProcessPoolExecutor( max_workers = workers, initializer = _init_pair_worker, initargs = ( self._box_ids, ) )
+
+
+	def __enter__( self ):
+		return self
+
+
+	def __exit__( self, *_exc ):
+		if self._executor:
+			self._executor.shutdown( )
+
+
+	@property
+	def box_ids( self ) -> List[ str ]:
+		"""
+		The stripped box ids, in input order.
+		"""
+
+		return self._box_ids
+
+
+	def pairs_within( self, max_distance: int ) -> List[ Tuple[ int, int, int ] ]:
+		"""
+		Finds all pairs of box ids within max_distance edits of each other.
+
+		Arguments:
+			max_distance {int} -- The largest edit distance to include.
+
+		Returns:
+			list -- ( distance, index_a, index_b ) tuples sorted by distance, then by input order.
+		"""
+
+		chunk_size = max( 1, -( -len( self._box_ids ) // ( self._workers * 4 ) ) )
+		query_ranges = [ ( i, min( i + chunk_size, len( self._box_ids ) ) ) for i in range( 0, len( self._box_ids ), chunk_size ) ]
+
+		if self._executor:
+			chunks = self._executor.map( _find_pairs_for_chunk, query_ranges, repeat( max_distance ) )
+		else:
+			if max_distance not in self._indexes:
+				self._indexes[ max_distance ] = _build_partition_index( self._box_ids, max_distance )
+			chunks = [ _find_pairs_in_range( self._box_ids, self._indexes[ max_distance ], max_distance, r, max_distance ) for r in query_ranges ]
+
+		return sorted( chain.from_iterable( chunks ) )
+
+
+def find_similar_box_id_pairs( input_lines: Sequence[ str ], max_distance: int, k: Optional[ int ] = None,
+										 workers: int = 1 ) -> List[ Tuple[ int, str, str ] ]:
+	"""
+	Finds all pairs of box ids within max_distance edits of each other, ranked from closest to furthest.
+	Candidates come from a partition filter index, so only ids sharing an unchanged segment are ever compared, and each
+	candidate is checked with an edit distance that stops once it passes max_distance. Queries can be split across a
+	process pool.
+
+	Arguments:
+		input_lines {list} -- list of box ids
+		max_distance {int} -- The largest edit distance to include.
+
+	Keyword Arguments:
+		k {int} -- Only return the k closest pairs. (default: {None})
+		workers {int} -- The number of worker processes. 1 runs the queries in this process. (default: {1})
+
+	Returns:
+		list -- ( distance, box_id_a, box_id_b ) tuples sorted by distance, then by input order.
+	"""
+
+	with _PairSearch( input_lines, workers ) as search:
+		pairs = search.pairs_within( max_distance )
+		if k is not None:
+			pairs = pairs[ : k ]
+
+		return [ ( distance, search.box_ids[ i ], search.box_ids[ j ] ) for distance, i, j in pairs ]
+
+
+def find_closest_box_id_pairs( input_lines: Sequence[ str ], k: int, workers: int = 1 ) -> List[ Tuple[ int, str, str ] ]:
+	"""
+	Finds the k closest pairs of box ids by edit distance. The search radius starts at one edit and doubles until at
+	least k pairs are found. The ids and the process pool are set up once and reused for every radius.
+
+	Arguments:
+		input_lines {list} -- list of box ids
+		k {int} -- The number of pairs to return.
+
+	Keyword Arguments:
+		workers {int} -- The number of worker processes. 1 runs the queries in this process. (default: {1})
+
+	Returns:
+		list -- ( distance, box_id_a, box_id_b ) tuples sorted by distance, then by input order.
+	"""
+
+	with _PairSearch( input_lines, workers ) as search:
+		longest_id = max( ( len( box_id ) for box_id in search.box_ids ), default = 0 )
+		max_distance = 1
+		while True:
+			pairs = search.pairs_within( max_distance )
+			if len( pairs ) >= k or max_distance >= longest_id:
+				return [ ( distance, search.box_ids[ i ], search.box_ids[ j ] ) for distance, i, j in pairs[ : k ] ]
+			max_distance = min( max_distance * 2, longest_id )
+
+
+def get_matching_box_ids( input_lines: Sequence[ str ] ) -> str:
+	"""
+	Finds the two most similar box IDs and returns the characters common to both of those box ids.
+	Box ids that differ by a single character are found through a masked-position index. Only when no such pair exists
+	is the closest pair by edit distance found with find_closest_box_id_pairs( ).
+
+	Arguments:
+		input_lines {list} -- list of box ids
+
+	Returns:
+		str -- characters common to the two most similar box ids, in their original order.
+	"""
 
-	for i, il in enumerate( input_lines ):
-		for x in range( i+1, len( input_lines ) ):
-			m = SequenceMatcher( None, il, input_lines[ x ] )
-			if m.ratio( ) > highest_ratio:
-				highest_ratio = m.ratio( )
-				highest_lines = ( i, x )
+	one_off_ids = _find_box_ids_differing_by_one( input_lines )
+	if one_off_ids:
+		return _common_characters( *one_off_ids )
 
-	a = set( input_lines[ highest_lines[ 0 ] ].rstrip( ) )
-	b = set( input_lines[ highest_lines[ -1 ] ].rstrip( ) )
-	c = set.intersection( a, b )
+	closest_ids = find_closest_box_id_pairs( input_lines, 1, workers = 1 )
+	if not closest_ids:
+		return ''
 
-	return ''.join( list( c ) )
+	_distance, a, b = closest_ids[ 0 ]
+	return _common_characters( a, b )
 
 
 if __name__ == '__main__':
@@ -55,17 +55,22 @@ For example, in the claims above, only claim 3 is intact after all claims are ma
 What is the ID of the only claim that doesn't overlap?
 """
 
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from itertools import product
+import numpy
 import re
-from typing import List, Tuple
+from typing import List, Set, Tuple
 
 
 def _get_square_inches_overlap( claims : List[ tuple ] ) -> Tuple[ int, int ]:
 	"""
-	Finds the area of fabric overlap from all of the elves' fabric claims when laid out on a 1000 x 1000 inch piece of fabric.
+	Finds the area of fabric overlap from all of the elves' fabric claims when laid out on a piece of fabric large enough to hold every claim.
 	Also returns the claim id of the only claim that does not overlap any other
 
+	Each claim adds its four corners to a 2-D difference array, so a cumulative sum down both axes gives the number of
+	claims covering every square inch in O( claims + fabric area ). A summed-area table over that coverage then gives
+	the total coverage inside each claim in O( 1 ); a claim overlaps nothing when that total equals its own area.
+
 	**Arguments:**
 
 		:``claims``: `list` A list of tuples ( id, x_coord, y_coord, width, height )
@@ -80,24 +85,769 @@ def _get_square_inches_overlap( claims : List[ tuple ] ) -> Tuple[ int, int ]:
 		:``str``: The id of the only claim that does not overlap any other
 	"""
 
-	overlaps = { }
-	overlap_coords = defaultdict( list )
-	for id, x_coord, y_coord, width, height in claims:
-		overlaps[ id ] = set( )
+	ids, x, y, w, h = numpy.array( claims, dtype = numpy.int64 ).reshape( -1, 5 ).T
+	fabric_width = int( ( x + w ).max( initial = 0 ) )
+	fabric_height = int( ( y + h ).max( initial = 0 ) )
+
+	diff = numpy.zeros( ( fabric_width + 1, fabric_height + 1 ), dtype = numpy.int32 )
+	numpy.add.at( diff, ( x, y ), 1 )
+	numpy.add.at( diff, ( x + w, y ), -1 )
+	numpy.add.at( diff, ( x, y + h ), -1 )
+	numpy.add.at( diff, ( x + w, y + h ), 1 )
+	coverage = diff.cumsum( axis = 0 ).cumsum( axis = 1 )[ : fabric_width, : fabric_height ]
 
-		for x, y in product( range( x_coord, x_coord + width ), range( y_coord, y_coord + height ) ):
-			numbers = overlap_coords.get( ( x, y ), [ ] )
-			for n in numbers:
-				overlaps[ n ].add( id )
-				overlaps[ id ].add( n )
+	square_inches_overlap = int( numpy.count_nonzero( coverage > 1 ) )
 
-			overlap_coords[ ( x, y ) ].append( id )
+	summed_area = numpy.zeros( ( fabric_width + 1, fabric_height + 1 ), dtype = numpy.int64 )
+	summed_area[ 1 :, 1 : ] = coverage.cumsum( axis = 0 ).cumsum( axis = 1 )
+	claim_coverage = summed_area[ x + w, y + h ] - summed_area[ x, y + h ] - summed_area[ x + w, y ] + summed_area[ x, y ]
 
-	square_inches_overlap = len( [ z for z in overlap_coords if len( overlap_coords[ z ] ) > 1 ] )
-	id_of_claim_with_no_overlap = [ z for z in overlaps if len( overlaps[ z ] ) == 0 ][ 0 ]
+	id_of_claim_with_no_overlap = int( ids[ claim_coverage == w * h ][ 0 ] )
 	return square_inches_overlap, id_of_claim_with_no_overlap
 
 
+class _CoverageTree( ):
+	"""
+	Segment tree over compressed coordinates used by the sweep line. Each node keeps how many intervals cover it
+	entirely, plus the length of its span covered by at least one and at least two intervals. Cover counts are never
+	pushed down, so adding or removing an interval is O( log n ).
+	"""
+
+	def __init__( self, coords: List[ int ] ):
+		self._coords = coords
+		size = 4 * max( 1, len( coords ) )
+		self._count = [ 0 ] * size
+		self._covered_once = [ 0 ] * size
+		self._covered_twice = [ 0 ] * size
+
+
+	@property
+	def covered_once( self ) -> int:
+		"""
+		The length covered by one or more intervals.
+		"""
+
+		return self._covered_once[ 1 ]
+
+
+	@property
+	def covered_twice( self ) -> int:
+		"""
+		The length covered by two or more intervals.
+		"""
+
+		return self._covered_twice[ 1 ]
+
+
+	def update( self, start: int, end: int, delta: int ):
+		"""
+		Adds ( delta = 1 ) or removes ( delta = -1 ) the interval [ start, end ). Both ends must be in the coordinate list.
+
+		**Arguments:**
+
+			:``start``: `int` The start of the interval.
+			:``end``: `int` The end of the interval.
+			:``delta``: `int` 1 to add the interval, -1 to remove it.
+		"""
+
+		lo = bisect_left( self._coords, start )
+		hi = bisect_left( self._coords, end )
+		if lo < hi:
+			self._update( 1, 0, len( self._coords ) - 1, lo, hi, delta )
+
+
+	def _update( self, node: int, node_lo: int, node_hi: int, lo: int, hi: int, delta: int ):
+		"""
+		Applies delta to the node's span if [ lo, hi ) covers it, otherwise recurses into its children.
+		"""
+
+		if hi <= node_lo or node_hi <= lo:
+			return
+
+		if lo <= node_lo and node_hi <= hi:
+			self._count[ node ] += delta
+		else:
+			mid = ( node_lo + node_hi ) // 2
+			self._update( 2 * node, node_lo, mid, lo, hi, delta )
+			self._update( 2 * node + 1, mid, node_hi, lo, hi, delta )
+
+		self._pull( node, node_lo, node_hi )
+
+
+	def _pull( self, node: int, node_lo: int, node_hi: int ):
+		"""
+		Recalculates the covered lengths of a node from its cover count and its children.
+		"""
+
+		span = self._coords[ node_hi ] - self._coords[ node_lo ]
+		is_leaf = node_hi - node_lo == 1
+		count = self._count[ node ]
+
+		if count >= 2:
+			self._covered_once[ node ] = span
+			self._covered_twice[ node ] = span
+		elif count == 1:
+			self._covered_once[ node ] = span
+			self._covered_twice[ node ] = 0 if is_leaf else self._covered_once[ 2 * node ] + self._covered_once[ 2 * node + 1 ]
+		elif is_leaf:
+			self._covered_once[ node ] = 0
+			self._covered_twice[ node ] = 0
+		else:
+			self._covered_once[ node ] = self._covered_once[ 2 * node ] + self._covered_once[ 2 * node + 1 ]
+			self._covered_twice[ node ] = self._covered_twice[ 2 * node ] + self._covered_twice[ 2 * node + 1 ]
+
+
+def _count_dominated( points: List[ Tuple[ int, int ] ], queries: List[ Tuple[ int, int ] ] ) -> List[ int ]:
+	"""
+	For every query ( a, b ), counts the points ( px, py ) with px <= a and py <= b. The points and queries are swept
+	together in x order while a Fenwick tree over the compressed y values counts the points swept so far.
+
+	**Arguments:**
+
+		:``points``: `list` ( x, y ) points.
+		:``queries``: `list` ( a, b ) query corners.
+
+	**Keyword Arguments:**
+
+		None
+
+	**Returns:**
+
+		:``list``: The number of dominated points for each query, in query order.
+	"""
+
+	ys = sorted( set( py for _px, py in points ) )
+	tree = [ 0 ] * ( len( ys ) + 1 )
+	results = [ 0 ] * len( queries )
+
+	sorted_points = sorted( points )
+	p = 0
+	for q in sorted( range( len( queries ) ), key = lambda i: queries[ i ][ 0 ] ):
+		a, b = queries[ q ]
+		while p < len( sorted_points ) and sorted_points[ p ][ 0 ] <= a:
+			i = bisect_left( ys, sorted_points[ p ][ 1 ] ) + 1
+			while i <= len( ys ):
+				tree[ i ] += 1
+				i += i & -i
+			p += 1
+
+		total = 0
+		i = bisect_right( ys, b )
+		while i > 0:
+			total += tree[ i ]
+			i -= i & -i
+		results[ q ] = total
+
+	return results
+
+
+def _sweep_covered_area( rects: List[ Tuple[ int, int, int, int ] ] ) -> Tuple[ int, int ]:
+	"""
+	Sweeps a line over x with a _CoverageTree over the compressed y coordinates to measure the area covered by the
+	rectangles.
+
+	**Arguments:**
+
+		:``rects``: `list` ( x1, y1, x2, y2 ) rectangles, upper bounds exclusive.
+
+	**Keyword Arguments:**
+
+		None
+
+	**Returns:**
+
+		:``int``: The area covered by at least one rectangle.
+		:``int``: The area covered by at least two rectangles.
+	"""
+
+	events = sorted( [ ( x1, 1, y1, y2 ) for x1, y1, _x2, y2 in rects ] + [ ( x2, -1, y1, y2 ) for _x1, y1, x2, y2 in rects ] )
+	tree = _CoverageTree( sorted( set( y for _x1, y1, _x2, y2 in rects for y in ( y1, y2 ) ) ) )
+
+	covered_once = 0
+	covered_twice = 0
+	previous_x = events[ 0 ][ 0 ] if events else 0
+	for x, delta, y1, y2 in events:
+		covered_once += tree.covered_once * ( x - previous_x )
+		covered_twice += tree.covered_twice * ( x - previous_x )
+		tree.update( y1, y2, delta )
+		previous_x = x
+
+	return covered_once, covered_twice
+
+
+def _sweep_square_inches_overlap( claims : List[ tuple ] ) -> Tuple[ int, Set[ int ] ]:
+	"""
+	Sparse alternative to _get_square_inches_overlap( ) for claims with very large coordinates, where rasterizing the
+	fabric is not an option. Runs in O( n log n ) regardless of the size of the fabric.
+
+	The overlap area comes from a sweep line over x with a segment tree over the compressed y coordinates that tracks
+	the length covered by two or more claims.
+	A claim overlaps nothing when every other claim lies entirely to one side of it. Those are counted per side with
+	binary searches, and claims that are off two sides at once ( diagonal ) are counted with 2-D dominance queries and
+	subtracted so that they are not counted twice.
+
+	**Arguments:**
+
+		:``claims``: `list` A list of tuples ( id, x_coord, y_coord, width, height )
+
+	**Keyword Arguments:**
+
+		None
+
+	**Returns:**
+
+		:``int``: The area of fabric overlap in square inches.
+		:``set``: The ids of every claim that does not overlap any other
+	"""
+
+	rects = [ ( id, x, y, x + w, y + h ) for id, x, y, w, h in claims if w > 0 and h > 0 ]
+	no_overlap_ids = set( id for id, _x, _y, w, h in claims if w <= 0 or h <= 0 )
+
+	_covered_area, square_inches_overlap = _sweep_covered_area( [ r[ 1 : ] for r in rects ] )
+
+	x1s = sorted( r[ 1 ] for r in rects )
+	y1s = sorted( r[ 2 ] for r in rects )
+	x2s = sorted( r[ 3 ] for r in rects )
+	y2s = sorted( r[ 4 ] for r in rects )
+
+	left_below = _count_dominated( [ ( x2, y2 ) for _id, _x1, _y1, x2, y2 in rects ], [ ( x1, y1 ) for _id, x1, y1, _x2, _y2 in rects ] )
+	left_above = _count_dominated( [ ( x2, -y1 ) for _id, _x1, y1, x2, _y2 in rects ], [ ( x1, -y2 ) for _id, x1, _y1, _x2, y2 in rects ] )
+	right_below = _count_dominated( [ ( -x1, y2 ) for _id, x1, _y1, _x2, y2 in rects ], [ ( -x2, y1 ) for _id, _x1, y1, x2, _y2 in rects ] )
+	right_above = _count_dominated( [ ( -x1, -y1 ) for _id, x1, y1, _x2, _y2 in rects ], [ ( -x2, -y2 ) for _id, _x1, _y1, x2, y2 in rects ] )
+
+	for i, ( id, x1, y1, x2, y2 ) in enumerate( rects ):
+		disjoint = ( bisect_right( x2s, x1 ) + len( rects ) - bisect_left( x1s, x2 ) +
+						 bisect_right( y2s, y1 ) + len( rects ) - bisect_left( y1s, y2 ) -
+						 left_below[ i ] - left_above[ i ] - right_below[ i ] - right_above[ i ] )
+		if disjoint == len( rects ) - 1:
+			no_overlap_ids.add( id )
+
+	return square_inches_overlap, no_overlap_ids
+
+
+_STARTS = 0
+_SPANS = 1
+
+
+def _range_nodes( lo: int, hi: int, size: int ) -> List[ int ]:
+	"""
+	Decomposes [ lo, hi ) into the canonical nodes of an implicit segment tree over [ 0, size ), with the root at
+	node 1 and the children of node n at 2n and 2n + 1. The nodes' ranges are disjoint and exactly tile the interval.
+
+	**Arguments:**
+
+		:``lo``: `int` The start of the interval.
+		:``hi``: `int` The end of the interval, exclusive.
+		:``size``: `int` The number of leaves. Must be a power of two.
+
+	**Keyword Arguments:**
+
+		None
+
+	**Returns:**
+
+		:``list``: The canonical nodes, at most two per level.
+	"""
+
+	nodes = [ ]
+	l = lo + size
+	r = hi + size
+	while l < r:
+		if l & 1:
+			nodes.append( l )
+			l += 1
+		if r & 1:
+			r -= 1
+			nodes.append( r )
+		l >>= 1
+		r >>= 1
+
+	return nodes
+
+
+def _path_nodes( position: int, size: int ) -> List[ int ]:
+	"""
+	Returns the nodes from the leaf of position up to the root of an implicit segment tree over [ 0, size ). Exactly
+	one of them is a canonical node of any interval holding position.
+
+	**Arguments:**
+
+		:``position``: `int` A coordinate in [ 0, size ).
+		:``size``: `int` The number of leaves. Must be a power of two.
+
+	**Keyword Arguments:**
+
+		None
+
+	**Returns:**
+
+		:``list``: The nodes on the path, leaf first.
+	"""
+
+	nodes = [ ]
+	node = position + size
+	while node:
+		nodes.append( node )
+		node >>= 1
+
+	return nodes
+
+
+class _RectangleIndex( ):
+	"""
+	Two level segment tree over ( x1, y1, x2, y2 ) rectangles that reports each rectangle intersecting a query once.
+
+	Along one axis, [ a1, a2 ) overlaps a nonempty [ b1, b2 ) in exactly one of two ways: it starts inside it,
+	b1 <= a1 < b2, or it spans its start, a1 < b1 < a2. Starts are kept as points, stored at every node on their leaf's
+	path and found at the canonical nodes of the query range. Spans are kept as the intervals [ a1 + 1, a2 ), stored at
+	their canonical nodes and found on the path of b1. Either way a match is met at exactly one node. One table per
+	pairing of the x and y cases, each an x tree whose nodes hold a y tree, then finds every intersecting rectangle
+	exactly once.
+
+	Adding or removing a rectangle touches O( log^2 C ) nodes and a query visits O( log^2 C ) nodes plus one per
+	rectangle reported, for a coordinate range of C.
+	"""
+
+	def __init__( self, size: int ):
+		self._size = size
+		self._tables = { ( x_kind, y_kind ): { } for x_kind in ( _STARTS, _SPANS ) for y_kind in ( _STARTS, _SPANS ) }
+
+
+	@property
+	def size( self ) -> int:
+		"""
+		The size of the coordinate range [ 0, size ) the tree covers, in both x and y.
+		"""
+
+		return self._size
+
+
+	def _stored_nodes( self, lo: int, hi: int ) -> Tuple[ List[ int ], List[ int ] ]:
+		"""
+		Returns the nodes an interval is stored at as a start, and as a span.
+		"""
+
+		return _path_nodes( lo, self._size ), _range_nodes( lo + 1, hi, self._size )
+
+
+	def _queried_nodes( self, lo: int, hi: int ) -> Tuple[ List[ int ], List[ int ] ]:
+		"""
+		Returns the nodes searched for the starts, and the spans, overlapping an interval.
+		"""
+
+		return _range_nodes( lo, hi, self._size ), _path_nodes( lo, self._size )
+
+
+	def add( self, rect: Tuple[ int, int, int, int ], id: int ):
+		"""
+		Stores the id of a rectangle. Rectangles without area are not stored, as they can't intersect anything.
+
+		**Arguments:**
+
+			:``rect``: `tuple` ( x1, y1, x2, y2 ), upper bounds exclusive, inside [ 0, size ).
+			:``id``: `int` The id to store.
+		"""
+
+		x1, y1, x2, y2 = rect
+		if x1 >= x2 or y1 >= y2:
+			return
+
+		x_nodes = self._stored_nodes( x1, x2 )
+		y_nodes = self._stored_nodes( y1, y2 )
+		for ( x_kind, y_kind ), table in self._tables.items( ):
+			if not y_nodes[ y_kind ]:
+				continue
+			for x_node in x_nodes[ x_kind ]:
+				column = table.setdefault( x_node, { } )
+				for y_node in y_nodes[ y_kind ]:
+					column.setdefault( y_node, set( ) ).add( id )
+
+
+	def discard( self, rect: Tuple[ int, int, int, int ], id: int ):
+		"""
+		Removes the id of a rectangle, which must have been stored with the same bounds.
+
+		**Arguments:**
+
+			:``rect``: `tuple` ( x1, y1, x2, y2 ), upper bounds exclusive.
+			:``id``: `int` The id to remove.
+		"""
+
+		x1, y1, x2, y2 = rect
+		if x1 >= x2 or y1 >= y2:
+			return
+
+		x_nodes = self._stored_nodes( x1, x2 )
+		y_nodes = self._stored_nodes( y1, y2 )
+		for ( x_kind, y_kind ), table in self._tables.items( ):
+			if not y_nodes[ y_kind ]:
+				continue
+			for x_node in x_nodes[ x_kind ]:
+				column = table[ x_node ]
+				for y_node in y_nodes[ y_kind ]:
+					column[ y_node ].discard( id )
+					if not column[ y_node ]:
+						del column[ y_node ]
+				if not column:
+					del table[ x_node ]
+
+
+	def intersecting( self, rect: Tuple[ int, int, int, int ] ) -> List[ int ]:
+		"""
+		**Arguments:**
+
+			:``rect``: `tuple` ( x1, y1, x2, y2 ), upper bounds exclusive, inside [ 0, size ).
+
+		**Keyword Arguments:**
+
+			None
+
+		**Returns:**
+
+			:``list``: The ids of the stored rectangles sharing at least one square inch with the rectangle, each once.
+		"""
+
+		x1, y1, x2, y2 = rect
+		if x1 >= x2 or y1 >= y2:
+			return [ ]
+
+		x_nodes = self._queried_nodes( x1, x2 )
+		y_nodes = self._queried_nodes( y1, y2 )
+		found = [ ]
+		for ( x_kind, y_kind ), table in self._tables.items( ):
+			for x_node in x_nodes[ x_kind ]:
+				column = table.get( x_node )
+				if column:
+					for y_node in y_nodes[ y_kind ]:
+						found.extend( column.get( y_node, ( ) ) )
+
+		return found
+
+
+class FabricClaims( ):
+	"""
+	A set of fabric claims that can be edited one claim at a time while keeping the overlap area and every claim's
+	overlap state live, instead of re-running _get_square_inches_overlap( ) over the whole fabric after each edit.
+
+	The claims are kept in a _RectangleIndex( ), so the k claims touching an edited claim are found in O( log^2 C + k )
+	for a fabric C inches across, however large the claim is and however many claims share its rows or columns.
+	Adding or removing a claim only changes the overlap area inside that claim, by the area the other claims cover
+	there exactly once, which is measured with a sweep over just those neighbours in O( k log k ). Each claim also keeps
+	a count of the claims it intersects, updated in O( k ), so asking whether it is overlap-free is O( 1 ). An edit is
+	therefore O( log^2 C + k log k ) in all; the index is rebuilt, in O( n log^2 C ), only when a claim reaches past
+	every coordinate seen so far, which doubles its range.
+	"""
+
+	def __init__( self, claims: List[ tuple ] = ( ) ):
+		self._rects = { }
+		self._index = _RectangleIndex( 1 )
+		self._neighbour_counts = { }
+		self._overlap_area = 0
+
+		for claim in claims:
+			self.add_claim( claim )
+
+
+	@property
+	def overlap_area( self ) -> int:
+		"""
+		The area of fabric, in square inches, currently covered by two or more claims.
+		"""
+
+		return self._overlap_area
+
+
+	def is_overlap_free( self, id: int ) -> bool:
+		"""
+		**Arguments:**
+
+			:``id``: `int` The id of a claim in the set.
+
+		**Keyword Arguments:**
+
+			None
+
+		**Returns:**
+
+			:``bool``: True if no other claim currently overlaps the claim.
+		"""
+
+		return self._neighbour_counts[ id ] == 0
+
+
+	def add_claim( self, claim: tuple ):
+		"""
+		Adds a claim to the set.
+
+		**Arguments:**
+
+			:``claim``: `tuple` ( id, x_coord, y_coord, width, height ), as returned by _claims_parser( ).
+
+		**Raises:**
+
+			:``ValueError``: A claim with the same id is already in the set.
+		"""
+
+		id, x, y, w, h = claim
+		if id in self._rects:
+			raise ValueError( 'Claim #{0} is already in the set.'.format( id ) )
+
+		rect = ( x, y, x + w, y + h )
+		self._grow_index( max( x + w, y + h ) )
+		neighbours = self._find_intersecting( rect )
+		self._overlap_area += self._area_covered_exactly_once( rect, neighbours )
+
+		for n in neighbours:
+			self._neighbour_counts[ n ] += 1
+		self._neighbour_counts[ id ] = len( neighbours )
+
+		self._rects[ id ] = rect
+		self._index.add( rect, id )
+
+
+	def remove_claim( self, id: int ):
+		"""
+		Removes a claim from the set.
+
+		**Arguments:**
+
+			:``id``: `int` The id of the claim to remove.
+		"""
+
+		rect = self._rects.pop( id )
+		self._index.discard( rect, id )
+
+		neighbours = self._find_intersecting( rect )
+		self._overlap_area -= self._area_covered_exactly_once( rect, neighbours )
+
+		for n in neighbours:
+			self._neighbour_counts[ n ] -= 1
+		del self._neighbour_counts[ id ]
+
+
+	def _grow_index( self, extent: int ):
+		"""
+		Rebuilds the index over a doubled coordinate range until it covers [ 0, extent ).
+		"""
+
+		size = self._index.size
+		if extent <= size:
+			return
+
+		while size < extent:
+			size *= 2
+		self._index = _RectangleIndex( size )
+		for id, rect in self._rects.items( ):
+			self._index.add( rect, id )
+
+
+	def _find_intersecting( self, rect: Tuple[ int, int, int, int ] ) -> List[ int ]:
+		"""
+		Returns the ids of the claims in the set that share at least one square inch with the rectangle.
+		"""
+
+		return self._index.intersecting( rect )
+
+
+	def _area_covered_exactly_once( self, rect: Tuple[ int, int, int, int ], neighbours: List[ int ] ) -> int:
+		"""
+		Returns the area inside the rectangle covered by exactly one of the neighbouring claims.
+		"""
+
+		x1, y1, x2, y2 = rect
+		clipped = [ ( max( x1, nx1 ), max( y1, ny1 ), min( x2, nx2 ), min( y2, ny2 ) )
+						for nx1, ny1, nx2, ny2 in ( self._rects[ n ] for n in neighbours ) ]
+		covered_once, covered_twice = _sweep_covered_area( clipped )
+
+		return covered_once - covered_twice
+
+
+class ClaimIndex( ):
+	"""
+	Static R-tree over fabric claims for point and rectangle queries, instead of scanning every claimed square inch.
+
+	The tree is bulk loaded with Sort-Tile-Recursive packing: claims are sorted into vertical slabs by x and each slab
+	by y, then every run of node_capacity entries becomes a node, level by level, until one root remains. Every level
+	is stored as a ( 4, n ) NumPy array of bounding boxes and a node's children are always the entries
+	[ i * node_capacity, ( i + 1 ) * node_capacity ) of the level below, so no pointers are kept.
+	Queries walk the tree one level at a time for all query rectangles at once, keeping ( query, node ) pairs whose
+	boxes intersect, so a batch of queries is a handful of vectorized passes.
+	"""
+
+	def __init__( self, claims: List[ tuple ], node_capacity: int = 16 ):
+		"""
+		**Arguments:**
+
+			:``claims``: `list` A list of tuples ( id, x_coord, y_coord, width, height )
+
+		**Keyword Arguments:**
+
+			:``node_capacity``: `int` The most entries packed into one node. (default: 16)
+
+		**Raises:**
+
+			:``ValueError``: node_capacity is less than 2, so the levels would never shrink to a single root.
+		"""
+
+		if node_capacity < 2:
+			raise ValueError( 'node_capacity must be at least 2.' )
+
+		self._node_capacity = node_capacity
+
+		ids, x, y, w, h = numpy.array( claims, dtype = numpy.int64 ).reshape( -1, 5 ).T
+		boxes = numpy.stack( ( x, y, x + w, y + h ) )
+
+		order = self._str_order( boxes )
+		self._ids = ids[ order ]
+		self._levels = [ boxes[ :, order ] ]
+
+		while self._levels[ -1 ].shape[ 1 ] > 1:
+			below = self._levels[ -1 ]
+			starts = numpy.arange( 0, below.shape[ 1 ], node_capacity )
+			self._levels.append( numpy.stack( ( numpy.minimum.reduceat( below[ 0 ], starts ),
+															numpy.minimum.reduceat( below[ 1 ], starts ),
+															numpy.maximum.reduceat( below[ 2 ], starts ),
+															numpy.maximum.reduceat( below[ 3 ], starts ) ) ) )
+
+
+	def _str_order( self, boxes: numpy.ndarray ) -> numpy.ndarray:
+		"""
+		Returns the Sort-Tile-Recursive ordering of the claim boxes.
+		"""
+
+		count = boxes.shape[ 1 ]
+		leaf_count = -( -count // self._node_capacity )
+		slab_size = self._node_capacity * max( 1, int( numpy.ceil( numpy.sqrt( leaf_count ) ) ) )
+
+		x_centers = boxes[ 0 ] + boxes[ 2 ]
+		y_centers = boxes[ 1 ] + boxes[ 3 ]
+		by_x = numpy.argsort( x_centers, kind = 'stable' )
+		slabs = numpy.arange( count ) // slab_size
+
+		return by_x[ numpy.lexsort( ( y_centers[ by_x ], slabs ) ) ]
+
+
+	def claims_at( self, x: int, y: int ) -> List[ int ]:
+		"""
+		**Arguments:**
+
+			:``x``: `int` The x coordinate of a square inch of fabric.
+			:``y``: `int` The y coordinate of a square inch of fabric.
+
+		**Keyword Arguments:**
+
+			None
+
+		**Returns:**
+
+			:``list``: The ids of every claim covering that square inch, sorted.
+		"""
+
+		return self.claims_at_batch( [ ( x, y ) ] )[ 0 ].tolist( )
+
+
+	def claims_intersecting( self, x: int, y: int, width: int, height: int ) -> List[ int ]:
+		"""
+		**Arguments:**
+
+			:``x``: `int` The x coordinate of the rectangle's left edge.
+			:``y``: `int` The y coordinate of the rectangle's top edge.
+			:``width``: `int` The width of the rectangle.
+			:``height``: `int` The height of the rectangle.
+
+		**Keyword Arguments:**
+
+			None
+
+		**Returns:**
+
+			:``list``: The ids of every claim sharing at least one square inch with the rectangle, sorted.
+		"""
+
+		return self.claims_intersecting_batch( [ ( x, y, width, height ) ] )[ 0 ].tolist( )
+
+
+	def claims_at_batch( self, points ) -> List[ numpy.ndarray ]:
+		"""
+		Vectorized claims_at( ) for many square inches at once.
+
+		**Arguments:**
+
+			:``points``: `array_like` ( x, y ) coordinates, one row per square inch.
+
+		**Keyword Arguments:**
+
+			None
+
+		**Returns:**
+
+			:``list``: An array of sorted claim ids for each point, in point order.
+		"""
+
+		points = numpy.asarray( points, dtype = numpy.int64 ).reshape( -1, 2 )
+		return self._query( numpy.stack( ( points[ :, 0 ], points[ :, 1 ], points[ :, 0 ] + 1, points[ :, 1 ] + 1 ) ) )
+
+
+	def claims_intersecting_batch( self, rects ) -> List[ numpy.ndarray ]:
+		"""
+		Vectorized claims_intersecting( ) for many rectangles at once.
+
+		**Arguments:**
+
+			:``rects``: `array_like` ( x, y, width, height ) rectangles, one row per query.
+
+		**Keyword Arguments:**
+
+			None
+
+		**Returns:**
+
+			:``list``: An array of sorted claim ids for each rectangle, in query order.
+		"""
+
+		rects = numpy.asarray( rects, dtype = numpy.int64 ).reshape( -1, 4 )
+		return self._query( numpy.stack( ( rects[ :, 0 ], rects[ :, 1 ], rects[ :, 0 ] + rects[ :, 2 ], rects[ :, 1 ] + rects[ :, 3 ] ) ) )
+
+
+	def _query( self, queries: numpy.ndarray ) -> List[ numpy.ndarray ]:
+		"""
+		Walks the tree from the root for every ( x1, y1, x2, y2 ) column in queries, keeping only the ( query, node )
+		pairs whose boxes intersect at each level.
+		"""
+
+		query_count = queries.shape[ 1 ]
+		if not self._ids.size or not query_count:
+			return [ numpy.empty( 0, dtype = numpy.int64 ) for _q in range( query_count ) ]
+
+		query_idx = numpy.arange( query_count )
+		node_idx = numpy.zeros( query_count, dtype = numpy.int64 )
+		query_idx, node_idx = self._intersecting( self._levels[ -1 ], queries, query_idx, node_idx )
+
+		for level in reversed( self._levels[ : -1 ] ):
+			offsets = numpy.arange( self._node_capacity )
+			query_idx = numpy.repeat( query_idx, self._node_capacity )
+			node_idx = ( node_idx[ :, None ] * self._node_capacity + offsets ).ravel( )
+			in_level = node_idx < level.shape[ 1 ]
+			query_idx, node_idx = self._intersecting( level, queries, query_idx[ in_level ], node_idx[ in_level ] )
+
+		order = numpy.lexsort( ( self._ids[ node_idx ], query_idx ) )
+		splits = numpy.searchsorted( query_idx[ order ], numpy.arange( 1, query_count ) )
+		return numpy.split( self._ids[ node_idx ][ order ], splits )
+
+
+	@staticmethod
+	def _intersecting( level: numpy.ndarray, queries: numpy.ndarray, query_idx: numpy.ndarray, node_idx: numpy.ndarray ) -> Tuple[ numpy.ndarray, numpy.ndarray ]:
+		"""
+		Filters ( query, node ) pairs down to those whose boxes share at least one square inch.
+		"""
+
+		boxes = level[ :, node_idx ]
+		q = queries[ :, query_idx ]
+		hits = ( boxes[ 0 ] < q[ 2 ] ) & ( q[ 0 ] < boxes[ 2 ] ) & ( boxes[ 1 ] < q[ 3 ] ) & ( q[ 1 ] < boxes[ 3 ] )
+
+		return query_idx[ hits ], node_idx[ hits ]
+
+
 def _claims_parser( puzzle_input_filename : str ) -> List[ tuple ]:
 	"""
 	Returns a list of tuples ( id, x_coord, y_coord, width, height ) after parsing the input file.
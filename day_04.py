@@ -58,46 +58,30 @@ In the example above, Guard #99 spent minute 45 asleep more than any other guard
 What is the ID of the guard you chose multiplied by the minute you chose? (In the above example, the answer would be 99 * 45 = 4455.)
 """
 
-import copy
+from datetime import date
+import heapq
+import numpy
 import operator
-from collections import defaultdict
+import os
+import tempfile
+from typing import Iterable, Iterator, List, Tuple
 
+_GUARD_EVENT = 0
+_ASLEEP_EVENT = 1
+_WAKE_EVENT = 2
 
-def _find_sleepiest_guard( sleep_data ):
-	highest_sleep = 0
-	highest_sleep_guard = 0
-	highest_sleep_plot = { }
 
-	for guard, sleep_plot in sleep_data.items( ):
-		total_sleep = sum( sleep_plot.values( ) )
-		if total_sleep >= highest_sleep:
-			highest_sleep = total_sleep
-			highest_sleep_guard = guard
-			highest_sleep_plot = sleep_plot
+def _find_sleepiest_guard( guard_ids, sleep_matrix ):
+	sleepiest = int( numpy.argmax( sleep_matrix.sum( axis = 1 ) ) )
+	return( int( guard_ids[ sleepiest ] ), int( numpy.argmax( sleep_matrix[ sleepiest ] ) ) )
 
-	max_per_min = max( highest_sleep_plot.values( ) )
-	for key, val in highest_sleep_plot.items( ):
-		if val == max_per_min:
-			return( highest_sleep_guard, key )
 
+def _find_guard_who_sleeps_most_on_a_given_minute( guard_ids, sleep_matrix ):
+	if not sleep_matrix.any( ):
+		return( 0, 0 )
 
-def _find_guard_who_sleeps_most_on_a_given_minute( sleep_data ):
-	g = 0
-	m = 0
-	s = 0
-
-	for guard, sleep_plot in sleep_data.items( ):
-		if sleep_plot:
-			highest_sleep = max( sleep_plot.values( ) )
-			if highest_sleep > s:
-				s = highest_sleep
-				g = guard
-				for key, val in sleep_plot.items( ):
-					if val == s:
-						m = key
-						break
-
-	return( g, m )
+	g, m = divmod( int( numpy.argmax( sleep_matrix ) ), sleep_matrix.shape[ 1 ] )
+	return( int( guard_ids[ g ] ), m )
 
 
 
@@ -109,43 +93,355 @@ def _parser( input_filename ):
 	return lines
 
 
+def _parse_event( line: str ) -> Tuple[ int, int, int ]:
+	"""
+	Parses one raw log line, e.g. '[1518-09-09 00:04] Guard #1543 begins shift', into an event tuple.
+
+	Arguments:
+		line {str} -- A line from a guard log.
+
+	Returns:
+		tuple -- ( minute stamp, event kind, guard id or minute of the hour ). The minute stamp counts minutes from
+			0001-01-01, so the tuples sort chronologically.
+	"""
+
+	day = date( int( line[ 1 : 5 ] ), int( line[ 6 : 8 ] ), int( line[ 9 : 11 ] ) ).toordinal( )
+	hour = int( line[ 12 : 14 ] )
+	minute = int( line[ 15 : 17 ] )
+	stamp = ( day * 24 + hour ) * 60 + minute
+	info = line[ 19 : ].lower( )
+
+	if 'guard' in info:
+		return ( stamp, _GUARD_EVENT, int( info.split( )[ 1 ][ 1: ] ) )
+	if info.rstrip( ).endswith( 'asleep' ):
+		return ( stamp, _ASLEEP_EVENT, minute )
+
+	return ( stamp, _WAKE_EVENT, minute )
+
+
+def _write_sorted_run( events: List[ Tuple[ int, int, int ] ], directory: str ) -> str:
+	"""
+	Sorts a chunk of events and writes it to a temporary file of raw int64 triples.
+
+	Arguments:
+		events {list} -- Unsorted event tuples from _parse_event( ).
+		directory {str} -- The directory to write the run into.
+
+	Returns:
+		str -- The path to the sorted run.
+	"""
+
+	run = numpy.array( events, dtype = numpy.int64 ).reshape( -1, 3 )
+	run = run[ numpy.lexsort( ( run[ :, 2 ], run[ :, 1 ], run[ :, 0 ] ) ) ]
+
+	with tempfile.NamedTemporaryFile( dir = directory, suffix = '.run', delete = False ) as f:
+		run.tofile( f )
+
+	return f.name
+
+
+def _read_sorted_run( run_filename: str, block_size: int ) -> Iterator[ Tuple[ int, int, int ] ]:
+	"""
+	Streams the events back out of a sorted run, block_size events at a time.
+
+	Arguments:
+		run_filename {str} -- A run written by _write_sorted_run( ).
+		block_size {int} -- The number of events read from disk at once.
+
+	Yields:
+		tuple -- Event tuples in sorted order.
+	"""
+
+	with open( run_filename, 'rb' ) as f:
+		while True:
+			block = numpy.fromfile( f, dtype = numpy.int64, count = block_size * 3 )
+			if not block.size:
+				return
+			yield from map( tuple, block.reshape( -1, 3 ).tolist( ) )
+
+
+def _merge_runs( run_filenames: List[ str ], directory: str, block_size: int ) -> str:
+	"""
+	Merges sorted runs into one larger sorted run and deletes the inputs.
+
+	Arguments:
+		run_filenames {list} -- Runs written by _write_sorted_run( ).
+		directory {str} -- The directory to write the merged run into.
+		block_size {int} -- The number of events read from each input, and written out, at once.
+
+	Returns:
+		str -- The path to the merged run.
+	"""
+
+	with tempfile.NamedTemporaryFile( dir = directory, suffix = '.run', delete = False ) as f:
+		block = [ ]
+		for event in heapq.merge( *( _read_sorted_run( r, block_size ) for r in run_filenames ) ):
+			block.append( event )
+			if len( block ) == block_size:
+				numpy.array( block, dtype = numpy.int64 ).tofile( f )
+				block = [ ]
+		if block:
+			numpy.array( block, dtype = numpy.int64 ).tofile( f )
+
+	for r in run_filenames:
+		os.remove( r )
+
+	return f.name
+
+
+def _stream_events( input_filenames: Iterable[ str ], chunk_size: int = 1000000, max_fan_in: int = 64 ) -> Iterator[ Tuple[ int, int, int ] ]:
+	"""
+	Streaming alternative to _parser( ) for unsorted logs too large to hold in memory. Every file is read line by line
+	and parsed into integer event tuples, each chunk_size events are sorted and spilled to a temporary run file, and
+	the runs from all of the files are merged with heapq.merge( ).
+
+	No more than max_fan_in runs are ever open at once. While there are more runs than that, each group of max_fan_in
+	runs is merged into one larger run on disk, pass after pass, before the final merge is streamed out. This keeps the
+	open file count, and the block read from each run, fixed however large the logs grow. Only one chunk, plus one
+	block per open run, is ever in memory.
+
+	Arguments:
+		input_filenames {Iterable[ str ]} -- The guard log files.
+
+	Keyword Arguments:
+		chunk_size {int} -- The number of events sorted in memory per run. (default: {1000000})
+		max_fan_in {int} -- The most runs merged at once. (default: {64})
+
+	Raises:
+		ValueError -- max_fan_in is less than 2.
+
+	Yields:
+		tuple -- ( minute stamp, event kind, guard id or minute of the hour ) events in chronological order.
+	"""
+
+	if max_fan_in < 2:
+		raise ValueError( 'max_fan_in must be at least 2.' )
+
+	block_size = max( 1, chunk_size // max_fan_in )
+	with tempfile.TemporaryDirectory( ) as directory:
+		runs = [ ]
+		for input_filename in input_filenames:
+			with open( input_filename, 'r' ) as f:
+				chunk = [ ]
+				for line in f:
+					if line.strip( ):
+						chunk.append( _parse_event( line ) )
+					if len( chunk ) == chunk_size:
+						runs.append( _write_sorted_run( chunk, directory ) )
+						chunk = [ ]
+				if chunk:
+					runs.append( _write_sorted_run( chunk, directory ) )
+
+		while len( runs ) > max_fan_in:
+			runs = [ _merge_runs( runs[ i : i + max_fan_in ], directory, block_size ) for i in range( 0, len( runs ), max_fan_in ) ]
+
+		yield from heapq.merge( *( _read_sorted_run( r, block_size ) for r in runs ) )
+
+
 def _plot_guard_sleep( data ):
-	guard_data = defaultdict( dict )
+	"""
+	Builds a dense guard x minute matrix of how many times each guard was asleep during each minute of the midnight hour
+	from the sorted [ date, time, info ] records from _parser( ).
+
+	Arguments:
+		data {list} -- The sorted [ date, time, info ] records from _parser( ).
+
+	Returns:
+		numpy.ndarray -- The guard id of each row of the sleep matrix.
+		numpy.ndarray -- ( guard count, 60 ) matrix of the number of times each guard slept during each minute.
+	"""
+
+	def _events( ):
+		for _d, time, info in data:
+			if 'guard' in info:
+				yield ( 0, _GUARD_EVENT, int( info.split( )[ 1 ][ 1: ] ) )
+			elif info.endswith( 'asleep' ):
+				yield ( 0, _ASLEEP_EVENT, int( time[ 3: ] ) )
+			elif info.endswith( 'up' ):
+				yield ( 0, _WAKE_EVENT, int( time[ 3: ] ) )
+
+	return _plot_guard_sleep_events( _events( ) )
+
+
+def _plot_guard_sleep_events( events: Iterable[ Tuple[ int, int, int ] ] ):
+	"""
+	Builds the guard x minute sleep matrix from a chronological stream of events, such as the one from _stream_events( ).
+	Every nap adds +1 at its start minute and -1 at its wake minute in a per-guard difference array, and a cumulative
+	sum along the minutes turns that into the sleep counts. Only one row per guard is kept, however long the stream.
+
+	Arguments:
+		events {Iterable[ tuple ]} -- ( minute stamp, event kind, guard id or minute of the hour ) events in order.
+
+	Returns:
+		numpy.ndarray -- The guard id of each row of the sleep matrix.
+		numpy.ndarray -- ( guard count, 60 ) matrix of the number of times each guard slept during each minute.
+	"""
+
+	guard_rows = { }
+	sleep_diff = [ ]
+
+	for _stamp, guard_id, start_time, end_time in _iter_naps( events ):
+		row = guard_rows.get( guard_id, -1 )
+		if row == -1:
+			row = guard_rows[ guard_id ] = len( sleep_diff )
+			sleep_diff.append( [ 0 ] * 61 )
+		sleep_diff[ row ][ start_time ] += 1
+		sleep_diff[ row ][ end_time ] -= 1
+
+	sleep_diff = numpy.array( sleep_diff, dtype = numpy.int64 ).reshape( -1, 61 )
+	return numpy.fromiter( guard_rows, dtype = numpy.int64, count = len( guard_rows ) ), sleep_diff.cumsum( axis = 1 )[ :, : 60 ]
+
+
+def _iter_naps( events: Iterable[ Tuple[ int, int, int ] ] ) -> Iterator[ Tuple[ int, int, int, int ] ]:
+	"""
+	Pairs up the asleep and wake events of a chronological event stream.
+
+	Arguments:
+		events {Iterable[ tuple ]} -- ( minute stamp, event kind, guard id or minute of the hour ) events in order.
+
+	Yields:
+		tuple -- ( minute stamp of falling asleep, guard id, first minute asleep, minute of waking ) for every nap.
+	"""
 
 	counting = False
+	start_stamp = -1
 	start_time = -1
-	mins_list = { }
-	id = -1
-	for _d, time, info in data:
-		if 'guard' in info:
-			if id > -1:
-				guard_data[ id ] = copy.copy( mins_list )
-				id = -1
-				mins_list.clear( )
-			id = int( info.split( )[ 1 ][ 1: ] )
-			mins_list = guard_data.setdefault( id, { } )
-		elif info.endswith( 'asleep' ):
+	guard_id = None
+	for stamp, kind, value in events:
+		if kind == _GUARD_EVENT:
+			guard_id = value
+		elif kind == _ASLEEP_EVENT:
 			if not counting:
-				start_time = int( time[ 3: ] )
+				start_stamp = stamp
+				start_time = value
 				counting = True
-		elif info.endswith( 'up' ):
-			if counting:
-				end_time = int( time[ 3: ] )
-				for i in range( start_time, end_time ):
-					if i in mins_list:
-						mins_list[ i ] = mins_list[ i ] + 1
-					else:
-						mins_list[ i ] = 1
-				counting = False
-				start_time = -1
+		elif kind == _WAKE_EVENT:
+			if counting and guard_id is not None:
+				yield ( start_stamp, guard_id, start_time, value )
+			counting = False
+			start_time = -1
+
+
+class SleepIndex( ):
+	"""
+	Persistable per-day, per-guard, per-minute cumulative sleep index. Row i of the cumulative array holds the sleep
+	matrix summed over every logged day before days[ i ], so the sleep matrix for any date range is the difference of
+	two rows, found with binary searches, in O( guards x 60 ) however long the log is.
+	"""
+
+	def __init__( self, days: numpy.ndarray, guard_ids: numpy.ndarray, cumulative: numpy.ndarray ):
+		self._days = days
+		self._guard_ids = guard_ids
+		self._cumulative = cumulative
+
+
+	@classmethod
+	def from_events( cls, events: Iterable[ Tuple[ int, int, int ] ] ) -> 'SleepIndex':
+		"""
+		Builds the index from a chronological event stream, such as the one from _stream_events( ).
+
+		Arguments:
+			events {Iterable[ tuple ]} -- ( minute stamp, event kind, guard id or minute of the hour ) events in order.
+
+		Returns:
+			SleepIndex -- The cumulative sleep index.
+		"""
+
+		guard_rows = { }
+		nap_days = [ ]
+		nap_rows = [ ]
+		nap_starts = [ ]
+		nap_ends = [ ]
+		for stamp, guard_id, start_time, end_time in _iter_naps( events ):
+			nap_days.append( stamp // 1440 )
+			nap_rows.append( guard_rows.setdefault( guard_id, len( guard_rows ) ) )
+			nap_starts.append( start_time )
+			nap_ends.append( end_time )
+
+		days, day_rows = numpy.unique( numpy.array( nap_days, dtype = numpy.int64 ), return_inverse = True )
+		sleep_diff = numpy.zeros( ( len( days ), len( guard_rows ), 61 ), dtype = numpy.int64 )
+		numpy.add.at( sleep_diff, ( day_rows, nap_rows, nap_starts ), 1 )
+		numpy.add.at( sleep_diff, ( day_rows, nap_rows, nap_ends ), -1 )
+
+		cumulative = numpy.zeros( ( len( days ) + 1, len( guard_rows ), 60 ), dtype = numpy.int64 )
+		cumulative[ 1 : ] = sleep_diff.cumsum( axis = 2 )[ :, :, : 60 ].cumsum( axis = 0 )
+
+		return cls( days, numpy.fromiter( guard_rows, dtype = numpy.int64, count = len( guard_rows ) ), cumulative )
+
+
+	@classmethod
+	def load( cls, filename: str ) -> 'SleepIndex':
+		"""
+		Loads an index written by save( ).
+
+		Arguments:
+			filename {str} -- The .npz file to load.
+
+		Returns:
+			SleepIndex -- The cumulative sleep index.
+		"""
+
+		with numpy.load( filename ) as data:
+			return cls( data[ 'days' ], data[ 'guard_ids' ], data[ 'cumulative' ] )
+
+
+	def save( self, filename: str ):
+		"""
+		Writes the index to a .npz file.
+
+		Arguments:
+			filename {str} -- The file to write.
+		"""
+
+		numpy.savez( filename, days = self._days, guard_ids = self._guard_ids, cumulative = self._cumulative )
+
+
+	def sleep_matrix( self, start_date: date, end_date: date ) -> Tuple[ numpy.ndarray, numpy.ndarray ]:
+		"""
+		Returns the guard x minute sleep matrix for the inclusive date range, in the same form as _plot_guard_sleep( ),
+		so _find_sleepiest_guard( ) and _find_guard_who_sleeps_most_on_a_given_minute( ) can be run on it.
+
+		Arguments:
+			start_date {date} -- The first day of the range.
+			end_date {date} -- The last day of the range.
+
+		Returns:
+			numpy.ndarray -- The guard id of each row of the sleep matrix.
+			numpy.ndarray -- ( guard count, 60 ) matrix of the number of times each guard slept during each minute.
+		"""
+
+		first = numpy.searchsorted( self._days, start_date.toordinal( ), side = 'left' )
+		last = numpy.searchsorted( self._days, end_date.toordinal( ), side = 'right' )
+		last = max( first, last )
+
+		return self._guard_ids, self._cumulative[ last ] - self._cumulative[ first ]
+
+
+	def sleepiest_guard_on_minute( self, minute: int, start_date: date, end_date: date ) -> Tuple[ int, int ]:
+		"""
+		Finds the guard who slept most often on the given minute within the inclusive date range.
+
+		Arguments:
+			minute {int} -- The minute of the midnight hour.
+			start_date {date} -- The first day of the range.
+			end_date {date} -- The last day of the range.
+
+		Returns:
+			tuple -- ( guard id, number of days that guard was asleep on that minute ).
+		"""
+
+		guard_ids, sleep_matrix = self.sleep_matrix( start_date, end_date )
+		if not len( guard_ids ):
+			return ( 0, 0 )
 
-	return guard_data
+		g = int( numpy.argmax( sleep_matrix[ :, minute ] ) )
+		return ( int( guard_ids[ g ] ), int( sleep_matrix[ g, minute ] ) )
 
 
 if __name__ == '__main__':
 	sleep_schedule = _parser( r'day_04_input.txt' )
-	sleep_data = _plot_guard_sleep( sleep_schedule )
-	sleepiest_guard, sleepiest_minute = _find_sleepiest_guard( sleep_data )
+	guard_ids, sleep_matrix = _plot_guard_sleep( sleep_schedule )
+	sleepiest_guard, sleepiest_minute = _find_sleepiest_guard( guard_ids, sleep_matrix )
 	print( "The sleepiest guard * that guard's sleepiest minute is: ", sleepiest_guard * sleepiest_minute )
-	g, m = _find_guard_who_sleeps_most_on_a_given_minute( sleep_data )
+	g, m = _find_guard_who_sleeps_most_on_a_given_minute( guard_ids, sleep_matrix )
 	print( "The guard who sleep the most on a given minute * that minute is: ", g * m )
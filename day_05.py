@@ -39,49 +39,168 @@ In this example, removing all C/c units was best, producing the answer 4.
 What is the length of the shortest polymer you can produce by removing all units of exactly one type and fully reacting the result?
 """
 
+from concurrent.futures import ProcessPoolExecutor
 import copy
+from itertools import repeat
+import mmap
+import os
 import string
-from typing import Iterator
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
 
 
-def _react( polymer : str ) -> str:
+def _react( polymer : Union[ str, bytes, Iterable[ bytes ] ] ) -> Union[ str, bytes ]:
 	"""
-	Reacts the polymer by repeatedly looping over it and removing 'aA', 'bB', 'Cc', etc.. pairs until none exist
+	Reacts the polymer in a single pass. Units are pushed onto a stack and a unit that is the same type but opposite
+	polarity of the unit on top of the stack ( the two ASCII codes differ only by the 0x20 case bit ) pops it instead,
+	so every unit is touched once and no intermediate polymers are built.
+
+	The polymer can also be an iterable of byte chunks, e.g. read from a pipe, in which case only the stack of
+	surviving units is ever held in memory.
 
 	Arguments:
-		polymer {str} -- The original string representing the polymer
+		polymer {str} -- The original string, bytes or iterable of byte chunks representing the polymer
 
 	Returns:
-		str -- The new string representing the reacted polymer
+		str -- The new string representing the reacted polymer. Bytes are returned when bytes or chunks are provided.
+	"""
+
+	if isinstance( polymer, str ):
+		chunks = [ polymer.encode( 'ascii' ) ]
+	elif isinstance( polymer, ( bytes, bytearray, memoryview ) ):
+		chunks = [ polymer ]
+	else:
+		chunks = polymer
+
+	stack = bytearray( )
+	for chunk in chunks:
+		for unit in chunk:
+			if stack and stack[ -1 ] ^ unit == 0x20:
+				stack.pop( )
+			else:
+				stack.append( unit )
+
+	return stack.decode( 'ascii' ) if isinstance( polymer, str ) else bytes( stack )
+
+
+def _react_stream( chunks : Iterable[ bytes ], output : Optional[ BinaryIO ] = None ) -> int:
 	"""
+	Reacts a polymer of unknown length arriving as byte chunks, e.g. iter( lambda: sys.stdin.buffer.read( 65536 ), b'' ).
+	Units can only be known to survive once the input ends, so the reacted polymer is written out after the last chunk.
+
+	Arguments:
+		chunks {Iterable[ bytes ]} -- The polymer, in order, as byte chunks.
 
-	pairs = [ ''.join( x ) for x in zip( string.ascii_lowercase, string.ascii_uppercase ) ]
-	pairs.extend( p[ :: -1 ] for p in pairs[ : ] )
+	Keyword Arguments:
+		output {BinaryIO} -- If provided, the reacted polymer is written to it. (default: {None})
+
+	Returns:
+		int -- The length of the reacted polymer.
+	"""
 
-	while any( p in polymer for p in pairs ):
-		for p in pairs:
-			polymer = polymer.replace( p, '' )
+	reacted = _react( chunks )
+	if output is not None:
+		output.write( reacted )
 
-	return polymer
+	return len( reacted )
 
 
-def _find_best_reaction( polymer : str ) -> int:
+def _merge_reacted( left : bytearray, right : bytes ) -> bytearray:
+	"""
+	Joins two already reacted polymers. Reaction is associative, so only the units where the two polymers meet can
+	still react: units are cancelled off the end of left and the start of right until the boundary is stable.
+
+	Arguments:
+		left {bytearray} -- The reacted polymer on the left. It is extended in place.
+		right {bytes} -- The reacted polymer on the right.
+
+	Returns:
+		bytearray -- The reacted polymer for left followed by right.
+	"""
+
+	i = 0
+	while left and i < len( right ) and left[ -1 ] ^ right[ i ] == 0x20:
+		left.pop( )
+		i += 1
+
+	left += memoryview( right )[ i : ]
+	return left
+
+
+def _react_file_chunk( filename : str, start : int, end : int ) -> bytes:
+	"""
+	Process pool worker that memory-maps the polymer file and reacts the units in [ start, end ).
+
+	Arguments:
+		filename {str} -- Path to the polymer file.
+		start {int} -- Offset of the first unit in the chunk.
+		end {int} -- Offset one past the last unit in the chunk.
+
+	Returns:
+		bytes -- The reacted chunk.
+	"""
+
+	with open( filename, 'rb' ) as f, mmap.mmap( f.fileno( ), 0, access = mmap.ACCESS_READ ) as polymer:
+		return _react( polymer[ start : end ] )
+
+
+def _react_file( filename : str, chunk_size : int = 64 * 1024 * 1024, workers : Optional[ int ] = None ) -> bytes:
+	"""
+	Reacts a polymer file too large for f.read( ). The file is memory-mapped and split into chunk_size chunks that are
+	reacted in a process pool, then the reacted chunks are merged in order with _merge_reacted( ).
+
+	Arguments:
+		filename {str} -- Path to the polymer file.
+
+	Keyword Arguments:
+		chunk_size {int} -- The number of units reacted by each task. (default: {64 MiB})
+		workers {int} -- The number of worker processes. (default: {None})
+
+	Returns:
+		bytes -- The reacted polymer.
+	"""
+
+	size = os.path.getsize( filename )
+	starts = range( 0, size, chunk_size )
+	ends = [ min( s + chunk_size, size ) for s in starts ]
+
+	reacted = bytearray( )
+	with ProcessPoolExecutor( max_workers = workers ) as executor:
+		for chunk in executor.map( _react_file_chunk, repeat( filename ), starts, ends ):
+			reacted = _merge_reacted( reacted, chunk )
+
+	return bytes( reacted )
+
+
+def _find_best_reaction( polymer : Union[ str, bytes ] ) -> int:
 	"""
 	Removes all instances of a given letter and then reacts the polymer. This is done for all letters to find the shortest resultant polymer.
 
+	Removing a unit type commutes with reacting, so the polymer is reacted once first. A single scan over that reacted
+	polymer then feeds 26 reduction stacks at once, each one skipping its own unit type, and all 26 lengths fall out
+	of the same pass.
+
 	Arguments:
-		polymer {str} -- The original string representing the polymer
+		polymer {str} -- The original string, or bytes, representing the polymer
 
 	Returns:
 		int -- The length of the shortest, and therefor the most fully reacted, polymer
 	"""
 
-	counts = [ ]
-	for l, u in zip( string.ascii_lowercase, string.ascii_uppercase ):
-		new_polymer = polymer.replace( u, '' ).replace( l, '' )
-		counts.append( len( _react( new_polymer ) ) )
-
-	return min( counts )
+	units = _react( polymer.encode( 'ascii' ) if isinstance( polymer, str ) else polymer )
+	removed_types = string.ascii_lowercase.encode( 'ascii' )
+	stacks = [ bytearray( ) for _t in removed_types ]
+
+	for unit in units:
+		unit_type = unit | 0x20
+		for removed_type, stack in zip( removed_types, stacks ):
+			if unit_type == removed_type:
+				continue
+			if stack and stack[ -1 ] ^ unit == 0x20:
+				stack.pop( )
+			else:
+				stack.append( unit )
+
+	return min( len( s ) for s in stacks )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+"""
+--- Day 6: Chronal Coordinates ---
+The device on your wrist beeps several times, and once again you feel like you're falling.
+
+"Situation critical," the device announces. "Destination indeterminate. Chronal interference detected. Please specify new target coordinates."
+
+The device then produces a list of coordinates (your puzzle input). Are they places it thinks are safe or dangerous? It recommends you check manual
+page 729. The Elves did not give you a manual.
+
+If they're dangerous, maybe you can minimize the danger by finding the coordinate that gives the largest distance from the other points.
+
+Using only the Manhattan distance, determine the area around each coordinate by counting the number of integer X,Y locations that are closest to
+that coordinate (and aren't tied in distance to any other coordinate).
+
+Your goal is to find the size of the largest area that isn't infinite. For example, consider the following list of coordinates:
+
+1, 1
+1, 6
+8, 3
+3, 4
+5, 5
+8, 9
+If we name these coordinates A through F, we can draw them on a grid, putting 0,0 at the top left:
+
+..........
+.A........
+..........
+........C.
+...D......
+.....E....
+.B........
+..........
+..........
+........F.
+This view is partial - the actual grid extends infinitely in all directions. Using the Manhattan distance, each location's closest coordinate can
+be determined, shown here in lowercase:
+
+aaaaa.cccc
+aAaaa.cccc
+aaaddecccc
+aadddeccCc
+..dDdeeccc
+bb.deEeecc
+bBb.eeee..
+bbb.eeefff
+bbb.eeffff
+bbb.ffffFf
+Locations shown as . are equally far from two or more coordinates, and so they don't count as being closest to any.
+
+In this example, the areas of coordinates A, B, C, and F are infinite - while not shown here, their areas extend forever outside the visible grid.
+However, the areas of coordinates D and E are finite: D is closest to 9 locations, and E is closest to 17 (both including the coordinate's location
+itself). Therefore, in this example, the size of the largest area is 17.
+
+What is the size of the largest area that isn't infinite?
+
+--- Part Two ---
+On the other hand, if the coordinates are safe, maybe the best you can do is try to find a region near as many coordinates as possible.
+
+For example, suppose you want the sum of the Manhattan distance to all of the coordinates to be less than 32. For each location, add up the
+distances to all of the given coordinates; if the total of those distances is less than 32, that location is within the desired region.
+Using the same coordinates as above, the resulting region looks like this:
+
+..........
+.A........
+..........
+...###..C.
+..#D###...
+..###E#...
+.B.###....
+..........
+..........
+........F.
+In particular, consider the highlighted location 4,3 located at the top middle of the region. Its calculation is as follows, where abs() is the
+absolute value function:
+
+Distance to coordinate A: abs(4-1) + abs(3-1) =  5
+Distance to coordinate B: abs(4-1) + abs(3-6) =  6
+Distance to coordinate C: abs(4-8) + abs(3-3) =  4
+Distance to coordinate D: abs(4-3) + abs(3-4) =  2
+Distance to coordinate E: abs(4-5) + abs(3-5) =  3
+Distance to coordinate F: abs(4-8) + abs(3-9) = 10
+Total distance: 5 + 6 + 4 + 2 + 3 + 10 = 30
+Because the total distance to all coordinates (30) is less than 32, the location is within the region.
+
+This region, which also includes coordinates D and E, has a total size of 16.
+
+Your actual region will need to be much larger than this example, though, instead including all locations with a total distance of less than 10000.
+
+What is the size of the region containing all locations which have a total distance to all given coordinates of less than 10000?
+"""
+
+from itertools import combinations, product
+import numpy
+import re
+from typing import Dict, List, Optional, Tuple
+
+_TIED = -1
+_UNVISITED = -2
+_UNBOUNDED = 2 ** 62
+
+
+def _parse( filepath: str ) -> numpy.ndarray:
+	"""
+	Reads the list of coordinates.
+
+	Arguments:
+		filepath {str} -- Path to the puzzle input. Each line is formatted as: <x>, <y>
+
+	Returns:
+		numpy.ndarray -- ( coordinate count, 2 ) array of x, y coordinates.
+	"""
+
+	with open( filepath, 'r' ) as f:
+		return numpy.array( [ int( x ) for x in re.findall( r'-?\d+', f.read( ) ) ], dtype = numpy.int64 ).reshape( -1, 2 )
+
+
+def _nearest_coordinate_grid( coords: numpy.ndarray ) -> Tuple[ numpy.ndarray, Tuple[ int, int ] ]:
+	"""
+	Builds the Manhattan Voronoi diagram of the coordinates over their bounding box with a multi-source breadth first
+	search. On an open grid the BFS distance is the Manhattan distance, and the coordinates nearest to a location are
+	exactly the coordinates nearest to its neighbours one step closer, so a location is owned by a coordinate only when
+	every neighbour it is reached from agrees on the owner. Every location is visited once, in O( width x height ).
+
+	Arguments:
+		coords {numpy.ndarray} -- ( coordinate count, 2 ) array of x, y coordinates.
+
+	Returns:
+		numpy.ndarray -- ( width, height ) array of the index of the nearest coordinate to each location, or -1 for ties.
+		tuple -- The x, y coordinates of the grid's [ 0, 0 ] location.
+	"""
+
+	origin = coords.min( axis = 0 )
+	width, height = coords.max( axis = 0 ) - origin + 1
+	owners = numpy.full( width * height, _UNVISITED, dtype = numpy.int64 )
+
+	frontier = ( coords[ :, 0 ] - origin[ 0 ] ) * height + ( coords[ :, 1 ] - origin[ 1 ] )
+	frontier_owners = numpy.arange( len( coords ) )
+
+	while frontier.size:
+		order = numpy.argsort( frontier, kind = 'stable' )
+		frontier = frontier[ order ]
+		frontier_owners = frontier_owners[ order ]
+
+		# Locations reached from more than one direction are tied unless every direction agrees on the owner.
+		starts = numpy.flatnonzero( numpy.r_[ True, frontier[ 1 : ] != frontier[ : -1 ] ] )
+		lowest = numpy.minimum.reduceat( frontier_owners, starts )
+		highest = numpy.maximum.reduceat( frontier_owners, starts )
+		frontier = frontier[ starts ]
+		frontier_owners = numpy.where( lowest == highest, lowest, _TIED )
+		owners[ frontier ] = frontier_owners
+
+		x, y = numpy.divmod( frontier, height )
+		neighbours = [ ]
+		neighbour_owners = [ ]
+		for in_bounds, step in ( ( x > 0, -height ), ( x < width - 1, height ), ( y > 0, -1 ), ( y < height - 1, 1 ) ):
+			neighbours.append( frontier[ in_bounds ] + step )
+			neighbour_owners.append( frontier_owners[ in_bounds ] )
+
+		frontier = numpy.concatenate( neighbours )
+		frontier_owners = numpy.concatenate( neighbour_owners )
+		unvisited = owners[ frontier ] == _UNVISITED
+		frontier = frontier[ unvisited ]
+		frontier_owners = frontier_owners[ unvisited ]
+
+	return owners.reshape( width, height ), ( int( origin[ 0 ] ), int( origin[ 1 ] ) )
+
+
+def _largest_finite_area( coords: numpy.ndarray ) -> int:
+	"""
+	Finds the size of the largest area that isn't infinite. An area is infinite when it reaches the edge of the
+	coordinates' bounding box, as the locations beyond that edge are all closer to it too.
+
+	Arguments:
+		coords {numpy.ndarray} -- ( coordinate count, 2 ) array of x, y coordinates.
+
+	Returns:
+		int -- The number of locations in the largest finite area.
+	"""
+
+	owners, _origin = _nearest_coordinate_grid( coords )
+
+	areas = numpy.bincount( owners[ owners >= 0 ], minlength = len( coords ) )
+	border = numpy.concatenate( ( owners[ 0 ], owners[ -1 ], owners[ :, 0 ], owners[ :, -1 ] ) )
+	areas[ border[ border >= 0 ] ] = 0
+
+	return int( areas.max( ) )
+
+
+def _axis_distance_sums( values: numpy.ndarray, lo: int, hi: int ) -> numpy.ndarray:
+	"""
+	Sums the distance along one axis from every position in [ lo, hi ] to every coordinate value. With the values
+	sorted and prefix summed, the values at or below a position contribute count * position - their sum and the values
+	above it contribute their sum - count * position, so each position costs one binary search.
+
+	Arguments:
+		values {numpy.ndarray} -- The coordinate values along one axis.
+		lo {int} -- The first position.
+		hi {int} -- The last position.
+
+	Returns:
+		numpy.ndarray -- The total distance from each position in [ lo, hi ] to all of the values.
+	"""
+
+	values = numpy.sort( values )
+	prefix_sums = numpy.concatenate( ( [ 0 ], numpy.cumsum( values ) ) )
+	positions = numpy.arange( lo, hi + 1, dtype = numpy.int64 )
+
+	below = numpy.searchsorted( values, positions, side = 'right' )
+	return ( positions * below - prefix_sums[ below ] ) + ( prefix_sums[ -1 ] - prefix_sums[ below ] - positions * ( len( values ) - below ) )
+
+
+def _safe_region_size( coords: numpy.ndarray, limit: int = 10000 ) -> int:
+	"""
+	Counts the locations whose total Manhattan distance to all of the coordinates is less than the limit.
+
+	Manhattan distance separates by axis, so the total distance at x, y is the x axis sum at x plus the y axis sum at y,
+	and each axis only needs O( width ) and O( height ) sums from _axis_distance_sums( ). Outside the bounding box an
+	axis sum grows by the coordinate count per step, which bounds how far past the box the region can reach. The
+	locations are then counted with a two pointer pass over the sorted axis sums: as the x sum grows, the number of
+	y sums that still fit under the limit only shrinks.
+
+	Arguments:
+		coords {numpy.ndarray} -- ( coordinate count, 2 ) array of x, y coordinates.
+
+	Keyword Arguments:
+		limit {int} -- The total distance every location in the region must be less than. (default: {10000})
+
+	Returns:
+		int -- The number of locations in the region.
+	"""
+
+	lowest = coords.min( axis = 0 )
+	highest = coords.max( axis = 0 )
+	inner_x_sums = _axis_distance_sums( coords[ :, 0 ], lowest[ 0 ], highest[ 0 ] )
+	inner_y_sums = _axis_distance_sums( coords[ :, 1 ], lowest[ 1 ], highest[ 1 ] )
+
+	margin_x = max( 0, int( ( limit - inner_y_sums.min( ) - 1 ) // len( coords ) ) + 1 )
+	margin_y = max( 0, int( ( limit - inner_x_sums.min( ) - 1 ) // len( coords ) ) + 1 )
+	x_sums = numpy.sort( _axis_distance_sums( coords[ :, 0 ], lowest[ 0 ] - margin_x, highest[ 0 ] + margin_x ) ).tolist( )
+	y_sums = numpy.sort( _axis_distance_sums( coords[ :, 1 ], lowest[ 1 ] - margin_y, highest[ 1 ] + margin_y ) ).tolist( )
+
+	region_size = 0
+	fitting_y = len( y_sums )
+	for x_sum in x_sums:
+		while fitting_y and x_sum + y_sums[ fitting_y - 1 ] >= limit:
+			fitting_y -= 1
+		if not fitting_y:
+			break
+		region_size += fitting_y
+
+	return region_size
+
+
+def _sum_positive_minimum( lines: Dict[ int, int ], count: int ) -> int:
+	"""
+	Sums max( 0, min over the lines of slope * t + value ) over t = 0 .. count - 1. The minimum of lines only changes
+	line where two of them cross, so t is cut at every crossing and each piece is one arithmetic series, clipped to
+	where it is positive.
+
+	Arguments:
+		lines {dict} -- The value at t = 0 of each line, keyed by its integer slope.
+		count {int} -- The number of t values.
+
+	Returns:
+		int -- The sum.
+	"""
+
+	cuts = { 0, count }
+	for a, b in combinations( lines, 2 ):
+		crossing = ( lines[ b ] - lines[ a ] ) // ( a - b ) + 1
+		if 0 < crossing < count:
+			cuts.add( crossing )
+
+	total = 0
+	cuts = sorted( cuts )
+	for start, stop in zip( cuts, cuts[ 1 : ] ):
+		slope = min( lines, key = lambda k: ( k * start + lines[ k ], k * ( stop - 1 ) + lines[ k ] ) )
+		value = lines[ slope ]
+		# Keep only the t in [ start, stop ) where slope * t + value >= 1.
+		if slope > 0:
+			start = max( start, -( ( value - 1 ) // slope ) )
+		elif slope < 0:
+			stop = min( stop, ( value - 1 ) // -slope + 1 )
+		elif value < 1:
+			continue
+
+		if start < stop:
+			total += ( stop - start ) * ( slope * ( start + stop - 1 ) + 2 * value ) // 2
+
+	return total
+
+
+class NearestCoordinateIndex( ):
+	"""
+	Nearest coordinate index for coordinates spread too far apart to rasterize a grid over them.
+
+	Rotating the plane by 45 degrees, u = x + y and v = x - y, turns Manhattan distance into Chebyshev distance,
+	max( | du |, | dv | ), which a k-d tree can prune on one axis at a time. Nearest coordinate queries, including every
+	tied coordinate, walk that tree in O( log n ) for typical inputs.
+
+	Region areas are found without visiting locations or rows. Along a row, | x - a | - | x - b | is monotonic in x, so
+	each other coordinate limits a region to a half line of that row and the region's part of the row is one interval
+	with closed-form ends. Those ends only change formula at the y values of the coordinates and where a bound appears
+	or the region vanishes, so between those breakpoints the interval's first and last locations are lines in y and the
+	rows are summed in closed form with _sum_positive_minimum( ). That is O( n ) pieces of O( n ) work per coordinate,
+	however large the bounding box is.
+	"""
+
+	def __init__( self, coords: numpy.ndarray ):
+		self._coords = numpy.asarray( coords, dtype = numpy.int64 ).reshape( -1, 2 )
+		self._rotated = numpy.stack( ( self._coords[ :, 0 ] + self._coords[ :, 1 ], self._coords[ :, 0 ] - self._coords[ :, 1 ] ), axis = 1 ).tolist( )
+
+		# Nodes are ( coordinate index, split axis, left node, right node ), with -1 for no child.
+		self._nodes = [ ]
+		self._root = self._build( list( range( len( self._rotated ) ) ), 0 )
+
+
+	def _build( self, indices: List[ int ], axis: int ) -> int:
+		"""
+		Builds the k-d subtree over the given coordinates by splitting on the median along the axis, and returns the index
+		of its root node.
+		"""
+
+		if not indices:
+			return -1
+
+		indices.sort( key = lambda i: self._rotated[ i ][ axis ] )
+		median = len( indices ) // 2
+		node = len( self._nodes )
+		self._nodes.append( [ indices[ median ], axis, -1, -1 ] )
+		self._nodes[ node ][ 2 ] = self._build( indices[ : median ], 1 - axis )
+		self._nodes[ node ][ 3 ] = self._build( indices[ median + 1 : ], 1 - axis )
+
+		return node
+
+
+	def nearest( self, x: int, y: int ) -> List[ int ]:
+		"""
+		Finds the coordinates with the smallest Manhattan distance to a location.
+
+		Arguments:
+			x {int} -- The x coordinate of the location.
+			y {int} -- The y coordinate of the location.
+
+		Returns:
+			list -- The indices of every coordinate at the smallest distance, sorted. More than one means the location is tied.
+		"""
+
+		query = ( x + y, x - y )
+		best_distance = None
+		best = [ ]
+
+		pending = [ self._root ] if self._root != -1 else [ ]
+		while pending:
+			node = pending.pop( )
+			idx, axis, left, right = self._nodes[ node ]
+			point = self._rotated[ idx ]
+
+			distance = max( abs( point[ 0 ] - query[ 0 ] ), abs( point[ 1 ] - query[ 1 ] ) )
+			if best_distance is None or distance < best_distance:
+				best_distance = distance
+				best = [ idx ]
+			elif distance == best_distance:
+				best.append( idx )
+
+			offset = query[ axis ] - point[ axis ]
+			near, far = ( left, right ) if offset < 0 else ( right, left )
+			if far != -1 and abs( offset ) <= best_distance:
+				pending.append( far )
+			if near != -1:
+				pending.append( near )
+
+		return sorted( best )
+
+
+	@staticmethod
+	def _row_bounds( coords: numpy.ndarray, site: int, y: int ) -> Optional[ Tuple[ numpy.ndarray, numpy.ndarray ] ]:
+		"""
+		Returns the bounds each other coordinate puts on the site's part of row y: the region is the open interval of x
+		above every lower bound / 2 and below every upper bound / 2. Returns None when some coordinate is at least as
+		close as the site to every location of the row.
+		"""
+
+		xs = coords[ :, 0 ]
+		ys = coords[ :, 1 ]
+		xi, yi = coords[ site ]
+
+		others = numpy.arange( len( xs ) ) != site
+		xj = xs[ others ]
+		# | x - xi | - | x - xj | must be less than c for the site to win against coordinate j.
+		c = numpy.abs( y - ys[ others ] ) - abs( y - yi )
+		spread = numpy.abs( xj - xi )
+
+		if numpy.any( ( xj == xi ) & ( c <= 0 ) ) or numpy.any( ( xj != xi ) & ( c <= -spread ) ):
+			return None
+
+		bounded = ( xj != xi ) & ( c <= spread )
+		# Left of xj the difference rises with x, so the site wins below a bound; right of xj it falls, so above one.
+		return ( c + xi + xj )[ bounded & ( xj > xi ) ], ( xi + xj - c )[ bounded & ( xj < xi ) ]
+
+
+	@staticmethod
+	def _count_rows( coords: numpy.ndarray, site: int, first_y: int, last_y: int, min_x: int, max_x: int ) -> int:
+		"""
+		Counts the locations in rows first_y .. last_y, and columns min_x .. max_x, closest to the site. Every other
+		coordinate must keep the same kind of bound over the rows, and its bound must be linear in y, which holds
+		between the breakpoints found by region_areas( ).
+		"""
+
+		bounds = NearestCoordinateIndex._row_bounds( coords, site, first_y )
+		if bounds is None:
+			return 0
+
+		upper, lower = bounds
+		if last_y > first_y:
+			next_upper, next_lower = NearestCoordinateIndex._row_bounds( coords, site, first_y + 1 )
+			upper_slopes, lower_slopes = ( next_upper - upper ) // 2, ( next_lower - lower ) // 2
+		else:
+			upper_slopes, lower_slopes = numpy.zeros_like( upper ), numpy.zeros_like( lower )
+
+		# The bounds have even slopes, so the last location, ceil( upper / 2 ) - 1, and the first location,
+		# floor( lower / 2 ) + 1, are integer lines too. Only the tightest line of each slope matters.
+		last = { 0: max_x }
+		for slope, bound in zip( upper_slopes.tolist( ), upper.tolist( ) ):
+			location = -( -bound // 2 ) - 1
+			last[ slope ] = min( last.get( slope, location ), location )
+		first = { 0: min_x }
+		for slope, bound in zip( lower_slopes.tolist( ), lower.tolist( ) ):
+			location = bound // 2 + 1
+			first[ slope ] = max( first.get( slope, location ), location )
+
+		widths = { }
+		for last_slope, first_slope in product( last, first ):
+			slope = last_slope - first_slope
+			widths[ slope ] = min( widths.get( slope, _UNBOUNDED ), last[ last_slope ] - first[ first_slope ] + 1 )
+
+		return _sum_positive_minimum( widths, last_y - first_y + 1 )
+
+
+	def region_areas( self ) -> Tuple[ numpy.ndarray, numpy.ndarray ]:
+		"""
+		Counts the locations closest to each coordinate, row piece by row piece. A region is infinite when it reaches
+		the edge of the coordinates' bounding box, as every location beyond the edge is owned by the same coordinate as
+		the edge location it was moved out from; the edge rows are counted directly, and the edge columns by counting the
+		transposed coordinates.
+
+		Returns:
+			numpy.ndarray -- The number of locations closest to each coordinate, within the bounding box.
+			numpy.ndarray -- Whether each coordinate's region is finite.
+		"""
+
+		min_x, min_y = self._coords.min( axis = 0 ).tolist( )
+		max_x, max_y = self._coords.max( axis = 0 ).tolist( )
+		transposed = self._coords[ :, : : -1 ]
+		areas = numpy.zeros( len( self._coords ), dtype = numpy.int64 )
+		finite = numpy.ones( len( self._coords ), dtype = bool )
+
+		for site, ( xi, yi ) in enumerate( self._coords.tolist( ) ):
+			# Each other coordinate's bound bends at its y and the site's, and appears, vanishes or empties the row where
+			# the | y - yj | - | y - yi | term reaches 0 or +/- the x spread, on the slope between the two.
+			others = numpy.delete( self._coords, site, axis = 0 )
+			spread = numpy.abs( others[ :, 0 ] - xi )
+			halves = numpy.concatenate( [ others[ :, 1 ] + yi + offset for offset in ( -spread, 0, spread ) ] )
+			breakpoints = numpy.concatenate( ( others[ :, 1 ], halves // 2, -( -halves // 2 ), [ yi, min_y, max_y ] ) )
+			breakpoints = numpy.unique( breakpoints[ ( breakpoints >= min_y ) & ( breakpoints <= max_y ) ] ).tolist( )
+
+			for y in breakpoints:
+				areas[ site ] += self._count_rows( self._coords, site, y, y, min_x, max_x )
+			for above, below in zip( breakpoints, breakpoints[ 1 : ] ):
+				if below - above > 1:
+					areas[ site ] += self._count_rows( self._coords, site, above + 1, below - 1, min_x, max_x )
+
+			finite[ site ] = not ( any( self._count_rows( self._coords, site, y, y, min_x, max_x ) for y in ( min_y, max_y ) ) or
+										  any( self._count_rows( transposed, site, x, x, min_y, max_y ) for x in ( min_x, max_x ) ) )
+
+		return areas, finite
+
+
+	def largest_finite_area( self ) -> int:
+		"""
+		Returns:
+			int -- The number of locations in the largest finite region.
+		"""
+
+		areas, finite = self.region_areas( )
+		return int( areas[ finite ].max( initial = 0 ) )
+
+
+if __name__ == '__main__':
+	coords = _parse( r'day_06_input.txt' )
+	largest_area = _largest_finite_area( coords )
+	print( 'The size of the largest finite area is: ', largest_area )
+
+	region_size = _safe_region_size( coords )
+	print( 'The size of the region with a total distance of less than 10000 is: ', region_size )
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+--- Day 7: The Sum of Its Parts ---
+You find yourself standing on a snow-covered coastline; apparently, you landed a little off course. The region is too hilly to see the North Pole
+from here, but you do spot some Elves that seem to be trying to unpack something that washed ashore. It's quite cold out, so you decide to risk
+creating a paradox by asking them for directions.
+
+"Oh, are you the search party?" Somebody must have sent them to find you, they say. "We'll help you find Santa... er, the North Pole, once we
+finish assembling this sleigh."
+
+The instructions specify a series of steps and requirements about which steps must be finished before others can begin (your puzzle input).
+Each step is designated by a single letter. For example, suppose you have the following instructions:
+
+Step C must be finished before step A can begin.
+Step C must be finished before step F can begin.
+Step A must be finished before step B can begin.
+Step A must be finished before step D can begin.
+Step B must be finished before step E can begin.
+Step D must be finished before step E can begin.
+Step F must be finished before step E can begin.
+Visually, these requirements look like this:
+
+  -->A--->B--
+ /    \\      \\
+C      -->D----->E
+ \\           /
+  ---->F-----
+Your first goal is to determine the order in which the steps should be completed. If more than one step is ready, choose the step which is
+first alphabetically. In this example, the steps would be completed as follows:
+
+Only C is available, and so it is done first.
+Next, both A and F are available. A is first alphabetically, so it is done next.
+Then, even though F was available earlier, steps B and D are now also available, and B is the first alphabetically of the three.
+After that, only D and F are available. E is not available because only some of its prerequisites are complete. Therefore, D is completed next.
+F is the only choice, so it is done next.
+Finally, E is completed.
+So, in this example, the correct order is CABDFE.
+
+In what order should the steps in your instructions be completed?
+
+--- Part Two ---
+As you're about to begin construction, four of the Elves offer to help. "The Sun will set soon; it'll go faster if we work together." Now, you
+need to account for multiple people working on steps simultaneously. If multiple steps are available, workers should still begin them in
+alphabetical order.
+
+Each step takes 60 seconds plus an amount corresponding to its letter: A=1, B=2, C=3, and so on. So, step A takes 60+1=61 seconds, while step Z
+takes 60+26=86 seconds. No time is required between steps.
+
+To simplify things for the example, however, suppose you only have help from one Elf (a total of two workers) and that each step takes 60 fewer
+seconds (so that step A takes 1 second and step Z takes 26 seconds). Then, using the same instructions as above, the steps would be finished in
+the order CABFDE and it would take 15 seconds for two workers to complete these steps.
+
+With 5 workers and the 60+ second step durations described above, how long will it take to complete all of the steps?
+"""
+
+from collections import defaultdict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import heapq
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def _parse( filepath: str ) -> List[ Tuple[ str, str ] ]:
+	"""
+	Reads the step requirements.
+
+	Arguments:
+		filepath {str} -- Path to the puzzle input. Each line is formatted as:
+			Step <before> must be finished before step <after> can begin.
+
+	Returns:
+		list -- ( before, after ) tuples, one per requirement.
+	"""
+
+	with open( filepath, 'r' ) as f:
+		return re.findall( r'Step (\S+) must be finished before step (\S+) can begin', f.read( ) )
+
+
+def _build_graph( edges: List[ Tuple[ str, str ] ] ) -> Tuple[ Dict[ str, List[ str ] ], Dict[ str, int ] ]:
+	"""
+	Builds the adjacency lists and the number of unfinished requirements of every step.
+
+	Arguments:
+		edges {list} -- ( before, after ) requirement tuples.
+
+	Returns:
+		dict -- The steps that each step is a requirement of.
+		dict -- The number of requirements of each step.
+	"""
+
+	successors = defaultdict( list )
+	requirement_counts = { }
+	for before, after in edges:
+		successors[ before ].append( after )
+		requirement_counts.setdefault( before, 0 )
+		requirement_counts[ after ] = requirement_counts.get( after, 0 ) + 1
+
+	return successors, requirement_counts
+
+
+def _step_duration( step: str, base_duration: int = 60 ) -> int:
+	"""
+	Arguments:
+		step {str} -- A single letter step.
+
+	Keyword Arguments:
+		base_duration {int} -- The time every step takes on top of its letter value. (default: {60})
+
+	Raises:
+		ValueError -- The step is not a single letter, so it has no letter value.
+
+	Returns:
+		int -- The number of seconds the step takes: base_duration plus A=1, B=2, C=3, etc..
+	"""
+
+	if len( step ) != 1 or not 'A' <= step.upper( ) <= 'Z':
+		raise ValueError( 'Step {0!r} is not a single letter; pass a step_duration for steps with longer names.'.format( step ) )
+
+	return base_duration + ord( step.upper( ) ) - ord( 'A' ) + 1
+
+
+def _step_order( edges: List[ Tuple[ str, str ] ] ) -> List[ str ]:
+	"""
+	Orders the steps so that every step comes after its requirements, taking the alphabetically first ready step
+	each time. The ready steps are kept in a heap, so the order takes O( E + V log V ).
+
+	Arguments:
+		edges {list} -- ( before, after ) requirement tuples.
+
+	Raises:
+		ValueError -- The requirements contain a cycle, so some steps can never begin.
+
+	Returns:
+		list -- The steps in the order they should be completed.
+	"""
+
+	successors, requirement_counts = _build_graph( edges )
+	ready = [ step for step, count in requirement_counts.items( ) if count == 0 ]
+	heapq.heapify( ready )
+
+	order = [ ]
+	while ready:
+		step = heapq.heappop( ready )
+		order.append( step )
+		for s in successors[ step ]:
+			requirement_counts[ s ] -= 1
+			if requirement_counts[ s ] == 0:
+				heapq.heappush( ready, s )
+
+	if len( order ) < len( requirement_counts ):
+		raise ValueError( 'The step requirements contain a cycle.' )
+
+	return order
+
+
+def _simulate_workers( edges: List[ Tuple[ str, str ] ], worker_count: int = 5,
+							  step_duration: Callable[ [ str ], int ] = _step_duration ) -> int:
+	"""
+	Simulates worker_count workers completing the steps, each idle worker starting the alphabetically first ready step.
+	Instead of ticking one second at a time, the clock jumps straight to the next time a step finishes, kept in a heap
+	of ( finish time, step ) events, so long step durations cost nothing extra and the simulation is O( E + V log V ).
+
+	Arguments:
+		edges {list} -- ( before, after ) requirement tuples.
+
+	Keyword Arguments:
+		worker_count {int} -- The number of workers, including yourself. (default: {5})
+		step_duration {Callable} -- Returns the number of seconds a step takes. The default only knows single letter
+			steps, so graphs with longer step names, which _parse( ) accepts, must pass their own. (default: {_step_duration})
+
+	Raises:
+		ValueError -- worker_count is less than 1, a step has no duration, or the requirements contain a cycle, so some
+			steps can never begin.
+
+	Returns:
+		int -- The number of seconds until every step is complete.
+	"""
+
+	if worker_count < 1:
+		raise ValueError( 'worker_count must be at least 1.' )
+
+	successors, requirement_counts = _build_graph( edges )
+	ready = [ step for step, count in requirement_counts.items( ) if count == 0 ]
+	heapq.heapify( ready )
+
+	in_progress = [ ]
+	clock = 0
+	completed = 0
+	while ready or in_progress:
+		while ready and len( in_progress ) < worker_count:
+			step = heapq.heappop( ready )
+			heapq.heappush( in_progress, ( clock + step_duration( step ), step ) )
+
+		clock = in_progress[ 0 ][ 0 ]
+		while in_progress and in_progress[ 0 ][ 0 ] == clock:
+			_finish_time, step = heapq.heappop( in_progress )
+			completed += 1
+			for s in successors[ step ]:
+				requirement_counts[ s ] -= 1
+				if requirement_counts[ s ] == 0:
+					heapq.heappush( ready, s )
+
+	if completed < len( requirement_counts ):
+		raise ValueError( 'The step requirements contain a cycle.' )
+
+	return clock
+
+
+ExecutionReport = namedtuple( 'ExecutionReport', [ 'results', 'makespan', 'critical_path', 'critical_path_length', 'worker_utilization',
+															  'idle_fraction' ] )
+
+
+def _run_step( step: str, action: Callable[ [ ], Any ] ) -> Tuple[ Any, str, float, float ]:
+	"""
+	Pool task that runs one step's action and records which worker ran it and when.
+
+	Arguments:
+		step {str} -- The step being run.
+		action {Callable} -- The step's action.
+
+	Returns:
+		tuple -- ( action result, worker name, start time, end time ). The times are perf_counter( ) readings from the
+			worker, so only their difference is meaningful.
+	"""
+
+	start = time.perf_counter( )
+	result = action( )
+	end = time.perf_counter( )
+
+	return result, '{0}:{1}'.format( os.getpid( ), threading.current_thread( ).name ), start, end
+
+
+def _execute_steps( edges: List[ Tuple[ str, str ] ], actions: Dict[ str, Callable[ [ ], Any ] ], worker_count: int = 5,
+						  use_processes: bool = False ) -> ExecutionReport:
+	"""
+	Runs the step graph as a real workload. Each step's action is dispatched to a thread ( or process ) pool as soon as
+	its requirements are finished, with the alphabetically first ready step going first. At most worker_count steps are
+	handed to the pool at once, so a step that becomes ready later can still jump ahead of queued steps that sort after it.
+
+	Once every step has run, the measured step durations give the critical path, the longest chain of requirements,
+	which is the shortest the run could take with unlimited workers, and the fraction of the run each worker was busy.
+	Pools start workers lazily, so a worker that never ran a step has no name to report; the idle fraction is taken over
+	all worker_count workers instead, so those workers still count against the run.
+
+	Arguments:
+		edges {list} -- ( before, after ) requirement tuples.
+		actions {dict} -- The callable to run for each step. Callables must be picklable when use_processes is True.
+
+	Keyword Arguments:
+		worker_count {int} -- The number of workers in the pool. (default: {5})
+		use_processes {bool} -- Use a process pool instead of a thread pool. (default: {False})
+
+	Raises:
+		ValueError -- worker_count is less than 1, a step has no action, or the requirements contain a cycle.
+
+	Returns:
+		ExecutionReport -- The results of each step's action, the wall clock makespan in seconds, the critical path and its
+			length in seconds, the utilization of each worker that ran a step, and the fraction of the total worker time,
+			worker_count x makespan, that no step was running.
+	"""
+
+	if worker_count < 1:
+		raise ValueError( 'worker_count must be at least 1.' )
+
+	successors, requirement_counts = _build_graph( edges )
+	missing_steps = set( requirement_counts ) - set( actions )
+	if missing_steps:
+		raise ValueError( 'No action was provided for steps: {0}'.format( ', '.join( sorted( missing_steps ) ) ) )
+
+	ready = [ step for step, count in requirement_counts.items( ) if count == 0 ]
+	heapq.heapify( ready )
+
+	results = { }
+	timings = { }
+	finish_order = [ ]
+	executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+	run_start = time.perf_counter( )
+	with executor_class( max_workers = worker_count ) as executor:
+		in_progress = { }
+		while ready or in_progress:
+			while ready and len( in_progress ) < worker_count:
+				step = heapq.heappop( ready )
+				in_progress[ executor.submit( _run_step, step, actions[ step ] ) ] = step
+
+			done, _pending = wait( in_progress, return_when = FIRST_COMPLETED )
+			for future in sorted( done, key = in_progress.get ):
+				step = in_progress.pop( future )
+				results[ step ], worker, start, end = future.result( )
+				timings[ step ] = ( worker, start, end )
+				finish_order.append( step )
+				for s in successors[ step ]:
+					requirement_counts[ s ] -= 1
+					if requirement_counts[ s ] == 0:
+						heapq.heappush( ready, s )
+	makespan = time.perf_counter( ) - run_start
+
+	if len( finish_order ) < len( requirement_counts ):
+		raise ValueError( 'The step requirements contain a cycle.' )
+
+	# Steps finish in requirement order, so every step's requirements are settled before it is.
+	predecessors = defaultdict( list )
+	for before, after in edges:
+		predecessors[ after ].append( before )
+
+	path_lengths = { }
+	path_previous = { }
+	for step in finish_order:
+		_worker, start, end = timings[ step ]
+		previous = max( predecessors[ step ], key = path_lengths.get, default = None )
+		path_previous[ step ] = previous
+		path_lengths[ step ] = ( end - start ) + ( path_lengths[ previous ] if previous is not None else 0.0 )
+
+	critical_path = [ ]
+	step = max( path_lengths, key = path_lengths.get, default = None )
+	critical_path_length = path_lengths.get( step, 0.0 )
+	while step is not None:
+		critical_path.append( step )
+		step = path_previous[ step ]
+
+	busy_time = defaultdict( float )
+	for worker, start, end in timings.values( ):
+		busy_time[ worker ] += end - start
+	worker_utilization = { w: ( b / makespan if makespan else 0.0 ) for w, b in busy_time.items( ) }
+	idle_fraction = max( 0.0, 1.0 - sum( busy_time.values( ) ) / ( worker_count * makespan ) ) if makespan else 0.0
+
+	return ExecutionReport( results, makespan, critical_path[ :: -1 ], critical_path_length, worker_utilization, idle_fraction )
+
+
+if __name__ == '__main__':
+	edges = _parse( r'day_07_input.txt' )
+	print( 'The order the steps should be completed in is: ', ''.join( _step_order( edges ) ) )
+	print( 'The time it takes 5 workers to complete all of the steps is: ', _simulate_workers( edges ) )
@@ -50,76 +50,286 @@ So, in this example, the value of the root node is 66.
 What is the value of the root node?
 """
 
-from collections import defaultdict
-from itertools import count
+from array import array
+from collections import defaultdict, namedtuple
+import numpy
+from typing import Iterable, Iterator, Sequence, Tuple, Union
 
 _CHILD_NODE_KEY = 'children'
 _METADATA_NODE_KEY = 'metadata'
 
-def _parse( filepath : str ) -> list:
+def _parse( filepath : str ) -> array:
 	"""
-	[summary]
+	Reads the license numbers.
 
 	Arguments:
-		filepath {str} -- [description]
+		filepath {str} -- Path to the puzzle input.
 
 	Returns:
-		list -- [description]
+		array -- The license numbers as an array( 'i' ).
 	"""
 
 	with open( filepath, 'r' ) as f:
 		raw_data = f.read( ) # not readlines( ), as this needs to be one long string
 
-	data = list( map( int, raw_data.split( ) ) )
+	data = array( 'i', map( int, raw_data.split( ) ) )
 
 	return data
 
 
-def _build_node_tree( data: list ) -> tuple:
+def _build_node_tree( data: Sequence[ int ] ) -> tuple:
 	"""
-	[summary]
+	Builds the node tree from the license numbers. The numbers are read through a cursor and the nodes that still have
+	children to read are kept on an explicit stack, so nothing is copied per node and deep trees can't exhaust Python's
+	recursion limit. The tree is built in a single linear pass.
 
 	Arguments:
-		data {list} -- [description]
+		data {Sequence[ int ]} -- The license numbers, e.g. the array( 'i' ) from _parse( ).
 
 	Returns:
-		tuple -- [description]
+		tuple -- The root node and the license numbers left over after it.
 	"""
 
-	root_node = defaultdict( list )
+	cursor = 0
 
-	children_count, metadata_count, *data = data # A node header is 2 ints.
+	def _read_node( ):
+		nonlocal cursor
+		children_count, metadata_count = data[ cursor ], data[ cursor + 1 ] # A node header is 2 ints.
+		cursor += 2
+		return [ defaultdict( list ), children_count, metadata_count ]
 
-	counter = count( )
-	while next( counter ) < children_count:
-		child_node, data = _build_node_tree( data )
-		root_node[ _CHILD_NODE_KEY ].append( child_node ) # can't do .get( ) here as it may be setting up a new defaultdict.
+	root = _read_node( )
+	pending = [ root ]
+	while pending:
+		node = pending[ -1 ]
+		if node[ 1 ]:
+			node[ 1 ] -= 1
+			child = _read_node( )
+			node[ 0 ][ _CHILD_NODE_KEY ].append( child[ 0 ] ) # can't do .get( ) here as it may be setting up a new defaultdict.
+			pending.append( child )
+		else:
+			pending.pop( )
+			node[ 0 ][ _METADATA_NODE_KEY ].extend( data[ cursor : cursor + node[ 2 ] ] ) # can't do .get( ) here as it may be setting up a new defaultdict.
+			cursor += node[ 2 ]
 
-	metadata_vals = data[ : metadata_count ]
-	root_node[ _METADATA_NODE_KEY ].extend( metadata_vals ) # can't do .get( ) here as it may be setting up a new defaultdict.
+	return root[ 0 ], data[ cursor: ]
 
-	return root_node, data[ metadata_count: ]
 
+FlatTree = namedtuple( 'FlatTree', [ 'child_counts', 'first_child', 'metadata_offsets', 'metadata_counts', 'children', 'metadata' ] )
 
-def _sum_all_metadata( node: dict ) -> int:
+
+def _build_flat_tree( data: Sequence[ int ] ) -> FlatTree:
+	"""
+	Builds a compact columnar form of the node tree for trees with millions of nodes, where one dict and two lists per
+	node would dominate memory. Nodes are numbered in the order their headers are read, the root being node 0.
+
+	The i-th child of node n is children[ first_child[ n ] + i ] and its metadata is
+	metadata[ metadata_offsets[ n ] : metadata_offsets[ n ] + metadata_counts[ n ] ], so every lookup is index
+	arithmetic. The numbers are read with the same cursor and explicit stack as _build_node_tree( ).
+
+	Arguments:
+		data {Sequence[ int ]} -- The license numbers, e.g. the array( 'i' ) from _parse( ).
+
+	Returns:
+		FlatTree -- Parallel int32 NumPy arrays of each node's child count, first child slot and metadata offset and
+			count, the child slots holding node numbers, and the one contiguous metadata buffer.
+	"""
+
+	child_counts = array( 'i' )
+	first_child = array( 'i' )
+	metadata_offsets = array( 'i' )
+	metadata_counts = array( 'i' )
+	children = array( 'i' )
+	metadata = array( 'i' )
+
+	cursor = 0
+
+	def _read_node( ):
+		nonlocal cursor
+		node = len( child_counts )
+		child_counts.append( data[ cursor ] )
+		metadata_counts.append( data[ cursor + 1 ] )
+		first_child.append( len( children ) )
+		metadata_offsets.append( 0 )
+		children.extend( [ 0 ] * data[ cursor ] )
+		cursor += 2
+		return [ node, 0 ]
+
+	pending = [ _read_node( ) ]
+	while pending:
+		node, child_idx = pending[ -1 ]
+		if child_idx < child_counts[ node ]:
+			pending[ -1 ][ 1 ] += 1
+			child = _read_node( )
+			children[ first_child[ node ] + child_idx ] = child[ 0 ]
+			pending.append( child )
+		else:
+			pending.pop( )
+			metadata_offsets[ node ] = len( metadata )
+			metadata.extend( data[ cursor : cursor + metadata_counts[ node ] ] )
+			cursor += metadata_counts[ node ]
+
+	return FlatTree( *( numpy.frombuffer( column, dtype = numpy.int32 ) if column else numpy.zeros( 0, dtype = numpy.int32 )
+							  for column in ( child_counts, first_child, metadata_offsets, metadata_counts, children, metadata ) ) )
+
+
+def _sum_all_metadata( node: Union[ dict, FlatTree ] ) -> int:
+	"""
+	Sums the metadata of a node and all of its descendants. For a FlatTree every node's metadata is in one buffer, so
+	the whole tree is a single vectorized sum. A dict tree is walked with an explicit stack, so deep trees can't
+	exhaust Python's recursion limit.
+
+	Arguments:
+		node {dict} -- The root node from _build_node_tree( ), or the FlatTree from _build_flat_tree( ).
+
+	Returns:
+		int -- The sum of all metadata entries.
+	"""
+
+	if isinstance( node, FlatTree ):
+		return int( node.metadata.sum( dtype = numpy.int64 ) )
+
+	total = 0
+	pending = [ node ]
+	while pending:
+		n = pending.pop( )
+		total += sum( n.get( _METADATA_NODE_KEY, [ ] ) )
+		pending.extend( n.get( _CHILD_NODE_KEY, [ ] ) )
+
+	return total
+
+
+def _value_of_node( node: Union[ dict, FlatTree ] ) -> int:
+	"""
+	Finds the value of a node. A dict tree is first listed parent before child with an explicit stack, then valued from
+	the end of that list back, the same way _value_of_flat_tree( ) works, so every child's value is known before it is
+	referenced and deep trees can't exhaust Python's recursion limit.
+
+	Arguments:
+		node {dict} -- The root node from _build_node_tree( ), or the FlatTree from _build_flat_tree( ).
+
+	Returns:
+		int -- The value of the node.
+	"""
+
+	if isinstance( node, FlatTree ):
+		return _value_of_flat_tree( node )
+
+	order = [ ]
+	pending = [ node ]
+	while pending:
+		n = pending.pop( )
+		order.append( n )
+		pending.extend( n.get( _CHILD_NODE_KEY, [ ] ) )
+
+	values = { }
+	for n in reversed( order ):
+		entries = n.get( _METADATA_NODE_KEY, [ ] )
+		children = n.get( _CHILD_NODE_KEY, [ ] )
+		if not children:
+			values[ id( n ) ] = sum( entries )
+		else:
+			values[ id( n ) ] = sum( values[ id( children[ x - 1 ] ) ] for x in entries if 1 <= x <= len( children ) )
+
+	return values[ id( node ) ]
+
+
+def _value_of_flat_tree( tree: FlatTree ) -> int:
+	"""
+	Finds the value of the root node of a FlatTree. Children are always numbered after their parent, so working from
+	the last node back to the root means every child's value is known before it is referenced, and each node's value
+	is computed once.
+
+	Arguments:
+		tree {FlatTree} -- The FlatTree from _build_flat_tree( ).
+
+	Returns:
+		int -- The value of the root node.
+	"""
+
+	child_counts = tree.child_counts.tolist( )
+	first_child = tree.first_child.tolist( )
+	metadata_offsets = tree.metadata_offsets.tolist( )
+	metadata_counts = tree.metadata_counts.tolist( )
+	children = tree.children.tolist( )
+	metadata = tree.metadata.tolist( )
+
+	values = [ 0 ] * len( child_counts )
+	for n in range( len( child_counts ) - 1, -1, -1 ):
+		entries = metadata[ metadata_offsets[ n ] : metadata_offsets[ n ] + metadata_counts[ n ] ]
+		if not child_counts[ n ]:
+			values[ n ] = sum( entries )
+		else:
+			values[ n ] = sum( values[ children[ first_child[ n ] + x - 1 ] ] for x in entries if 1 <= x <= child_counts[ n ] )
+
+	return values[ 0 ] if values else 0
+
+
+def _stream_numbers( filepath : str, block_size : int = 1 << 20 ) -> Iterator[ int ]:
+	"""
+	Reads the license numbers from a file block by block, without holding the whole file in memory.
+
+	Arguments:
+		filepath {str} -- Path to the puzzle input.
+
+	Keyword Arguments:
+		block_size {int} -- The number of characters read at once. (default: {1 MiB})
+
+	Yields:
+		int -- The license numbers in order.
+	"""
+
+	with open( filepath, 'r' ) as f:
+		partial = ''
+		for block in iter( lambda: f.read( block_size ), '' ):
+			tokens = ( partial + block ).split( )
+			# A number cut off by the end of the block is finished by the next block.
+			partial = tokens.pop( ) if tokens and not block[ -1 ].isspace( ) else ''
+			yield from map( int, tokens )
+
+		if partial:
+			yield int( partial )
+
+
+def _evaluate_stream( numbers : Iterable[ int ] ) -> Tuple[ int, int ]:
 	"""
-	[summary]
+	Computes the metadata sum and the root node value in a single pass over the license numbers without building the
+	tree. Each open node keeps only its remaining child count, its metadata count and the values of its finished
+	children; when a node's metadata is read its value is computed and handed to its parent. Every node's value is
+	computed exactly once, however many metadata entries refer to it.
 
 	Arguments:
-		node {dict} -- [description]
+		numbers {Iterable[ int ]} -- The license numbers, e.g. from _parse( ) or _stream_numbers( ).
 
 	Returns:
-		int -- [description]
+		tuple -- The sum of all metadata entries and the value of the root node.
 	"""
 
-	return sum( node.get( _METADATA_NODE_KEY ) ) + sum( _sum_all_metadata( x ) for x in node.get( _CHILD_NODE_KEY, [ ] ) )
+	numbers = iter( numbers )
+	metadata_total = 0
+
+	pending = [ [ next( numbers ), next( numbers ), [ ] ] ] # A node header is 2 ints.
+	while True:
+		node = pending[ -1 ]
+		if node[ 0 ]:
+			node[ 0 ] -= 1
+			pending.append( [ next( numbers ), next( numbers ), [ ] ] )
+			continue
+
+		pending.pop( )
+		entries = [ next( numbers ) for _m in range( node[ 1 ] ) ]
+		metadata_total += sum( entries )
 
+		child_values = node[ 2 ]
+		if not child_values:
+			value = sum( entries )
+		else:
+			value = sum( child_values[ x - 1 ] for x in entries if 1 <= x <= len( child_values ) )
 
-def _value_of_node( node: dict ) -> int:
-	if not node.get( _CHILD_NODE_KEY ):
-		return sum( node[ _METADATA_NODE_KEY ] )
+		if not pending:
+			return metadata_total, value
 
-	return sum( _value_of_node( node.get( _CHILD_NODE_KEY )[ x - 1 ] ) for x in node.get( _METADATA_NODE_KEY ) if x <= len( node.get( _CHILD_NODE_KEY ) ) )
+		pending[ -1 ][ 2 ].append( value )
 
 
 if __name__ == '__main__':
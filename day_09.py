@@ -61,7 +61,6 @@ What would the new winning Elf's score be if the number of the last marble were
 """
 
 from collections import defaultdict, deque
-from itertools import cycle
 import re
 
 
@@ -79,23 +78,21 @@ class Game( ):
 
 	def __init__( self, player_count: int, final_marble_value: int, part_2_scale : bool = False ):
 		self._player_count = player_count
-		self._players = defaultdict( list )
+		self._players = defaultdict( int )
 		self._final_marble_value = final_marble_value if not part_2_scale else final_marble_value * 100
-		self._current_marble_idx = 0
 		self._marble = 0
-		self._circle = deque( [ self._marble ] )
+		self._circle = deque( [ self._marble ] ) # The current marble is always kept at the right end of the deque.
 
 
 	def _calculate_score( self ):
 		"""
-		Sums the totals of all of the elves' marbles. The winner is the elf with the highest score.
+		Finds the elf with the highest score. Scores are totalled as marbles are kept, so this is one pass over the elves.
 		"""
 
 		high_score = 0
 		winning_player = 0
 
-		for player, marbles in self._players.items( ):
-			score = sum( marbles )
+		for player, score in self._players.items( ):
 			if score > high_score:
 				high_score = score
 				winning_player = player
@@ -103,32 +100,30 @@ class Game( ):
 		print( 'The winning elf is: {0} with a score of: {1}'.format( winning_player, high_score ) )
 
 
-	def _turn( self, player: int ) -> bool:
+	def _play_turns( self ):
 		"""
-		Simulates a game turn of the elf marble game. The turn rules can be found in the module docstring.
-
-		Arguments:
-			player {int} -- The current player
+		Simulates every remaining game turn of the elf marble game. The turn rules can be found in the module docstring.
+		The current marble is kept at the right end of the circle, so every turn is a short deque rotation plus an
+		append or pop at the end, and each turn is O( 1 ) however large the circle grows. The deque methods are bound
+		to locals as this loop runs once per marble.
 		"""
 
-		self._marble += 1
-
-		if self._marble % 23 == 0:
-			extra_score_marble_idx = ( self._current_marble_idx - 7 ) % len( self._circle )
-			self._current_marble_idx = ( extra_score_marble_idx )
-			extra_score_marble = self._circle[ extra_score_marble_idx ]
-			self._circle.remove( self._circle[ extra_score_marble_idx ] )
-			self._players[ player ].extend( [ self._marble, extra_score_marble ] )
-		else:
-			insert_location = ( self._current_marble_idx + 1 ) % len( self._circle ) + 1
-			self._circle.insert( insert_location, self._marble )
-			self._current_marble_idx = insert_location
+		rotate = self._circle.rotate
+		append = self._circle.append
+		pop = self._circle.pop
+		scores = self._players
+		player_count = self._player_count
 
-		if self._marble == self._final_marble_value:
-			self._calculate_score( )
-			return True
+		for marble in range( self._marble + 1, self._final_marble_value + 1 ):
+			if marble % 23:
+				rotate( -1 )
+				append( marble )
+			else:
+				rotate( 7 )
+				scores[ ( marble - 1 ) % player_count + 1 ] += marble + pop( )
+				rotate( -1 )
 
-		return False
+		self._marble = max( self._marble, self._final_marble_value )
 
 
 	def play( self ):
@@ -136,13 +131,8 @@ class Game( ):
 		Public method to start the game once the initial state is established.
 		"""
 
-		game_over = False
-		while not game_over:
-			for p in cycle( range( 1, self._player_count + 1 ) ):
-				game_over = self._turn( p )
-				if game_over:
-					break
-
+		self._play_turns( )
+		self._calculate_score( )
 
 
 if __name__ == '__main__':